@@ -0,0 +1 @@
+# 합성 데이터 생성기와 성능 측정 (python -m benchmarks.run)
@@ -0,0 +1,149 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from mts_core.compare import TCS_COLUMN_MAPPING, TEMS_COLUMN_MAPPING, VALUE_MAPPINGS
+from mts_core.storage import REQUIRED_COLUMNS
+
+VIOLATION_TYPES = ['속도위반(구간)', '속도위반(지점)', '신호위반', '안전모미착용위반']
+STATUSES = ['전송완료', '계도전송완료', '보류자료(필터링)', '해상준비행사', '해상완료', '말소처리']
+VEHICLE_TYPES = {'승용': '승용차', '승합': '승합차', '화물': '화물차', '특수': '특수차', '건설': '건설차', '이륜차': '이륜차차'}
+LOCATION_TYPES = ['일반', '스쿨존', '실버존']
+OWNER_TYPES = ['개인', '법인', '관공서']
+DISTRICTS = ['종로구', '송파구', '남구', '안산시', '김포시', '양주시', '창원시', '김해시', '진주시', '고성군']
+SPEED_LIMITS = [30, 50, 60, 70, 80, 100]
+
+# 원래 열 이름 (compare 모듈의 매핑 역방향)
+TCS_SOURCE_COLUMNS = {target: source for source, target in TCS_COLUMN_MAPPING.items() if source != '설치 장소'}
+TEMS_SOURCE_COLUMNS = {target: source for source, target in TEMS_COLUMN_MAPPING.items()}
+
+
+# 장비코드 형식([F-J][0-9]{4})으로 만들 수 있는 코드 수
+MAX_EQUIPMENT = 5 * 10000
+
+
+# 서로 다른 [F-J][0-9]{4} 형식 장비코드
+def equipment_codes(count, rng):
+    if count > MAX_EQUIPMENT:
+        raise ValueError(f"장비코드는 최대 {MAX_EQUIPMENT}개까지 만들 수 있습니다.")
+    picked = rng.choice(MAX_EQUIPMENT, size=count, replace=False)
+    return np.array([f'{"FGHIJ"[index // 10000]}{index % 10000:04d}' for index in picked], dtype=object)
+
+
+# 단속 데이터 (필수 15개 열, 일련번호 '장비코드-연도-8자리', 장비별 단속량은 로그정규분포)
+def generate_violations(rows, seed=0, equipment_count=None, start='2024-10-01', days=30):
+    rng = np.random.default_rng(seed)
+    equipment_count = equipment_count or max(50, min(5000, rows // 200))
+    codes = equipment_codes(equipment_count, rng)
+    weights = rng.lognormal(0, 1, equipment_count)
+    equipment = rng.choice(codes, size=rows, p=weights / weights.sum())
+    start = pd.Timestamp(start)
+    timestamps = start + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit='s')
+    serials = rng.choice(90000000, size=rows, replace=False) + 10000000
+
+    speed_limit = rng.choice(SPEED_LIMITS, rows)
+    excess = np.clip(rng.exponential(12, rows).astype(int), 1, 120)
+    actual = speed_limit + excess
+    noticed = actual - (rng.random(rows) < 0.3) * rng.integers(0, 6, rows)
+    vehicle = rng.choice(list(VEHICLE_TYPES), rows, p=[0.6, 0.08, 0.2, 0.03, 0.03, 0.06])
+
+    df = pd.DataFrame({
+        '일련번호': pd.Series(equipment).str.cat(pd.Series(timestamps.year.astype(str)), sep='-').str.cat(pd.Series(serials.astype(str)), sep='-'),
+        '위반유형': rng.choice(VIOLATION_TYPES, rows, p=[0.3, 0.4, 0.25, 0.05]),
+        '위반일시': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+        '제한속도': speed_limit,
+        '실제주행속도': actual,
+        '실제초과속도': actual - speed_limit,
+        '고지주행속도': noticed,
+        '고지초과속도': np.maximum(noticed - speed_limit, 0),
+        '처리상태': rng.choice(STATUSES, rows),
+        '위반차로': rng.integers(0, 5, rows),
+        '차종': vehicle,
+        '장소구분': rng.choice(LOCATION_TYPES, rows, p=[0.8, 0.12, 0.08]),
+        '주민구분': rng.choice(OWNER_TYPES, rows, p=[0.85, 0.13, 0.02]),
+        '차명': pd.Series(vehicle).map(VEHICLE_TYPES).to_numpy(),
+        '위반장소': rng.choice(DISTRICTS, rows),
+    })
+    return df[REQUIRED_COLUMNS]
+
+
+def _spelling_variants(column):
+    mapping = VALUE_MAPPINGS[column]
+    return {target: [source for source, mapped in mapping.items() if mapped == target] for target in set(mapping.values())}
+
+
+# TCS/TEMS 장비 목록 쌍 (원래 열 이름, 표기 변형 포함, 최대 MAX_EQUIPMENT대). mismatch_rate 비율의 장비는 한 항목 값이 다름
+def generate_inventory_pair(rows, mismatch_rate=0.05, missing_rate=0.02, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = equipment_codes(rows, rng)
+    firms = sorted(set(VALUE_MAPPINGS['설치업체'].values()))
+    base = pd.DataFrame({
+        '장비코드': codes,
+        '장비운영상태': rng.choice(['정상운영', '시범운영', '폐기'], rows, p=[0.85, 0.1, 0.05]),
+        '단속형태': rng.choice(['과속제어기', '다기능제어기', '구간제어기'], rows, p=[0.5, 0.35, 0.15]),
+        '설치지점': [f'{district} 중앙로 {number}' for district, number in zip(rng.choice(DISTRICTS, rows), rng.integers(1, 999, rows))],
+        '관할경찰서': rng.choice(['고성경찰서', '창원중부경찰서', '김해서부경찰서', '진주경찰서'], rows),
+        '제한속도': rng.choice(SPEED_LIMITS, rows),
+        '설치업체': rng.choice(firms, rows),
+        '정상운영일': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3000, rows), unit='D'),
+    })
+    base['단속속도'] = base['제한속도'] + 11
+
+    def spell(df, column):
+        original = df[column].to_numpy(dtype=object)
+        spelled = original.copy()
+        for target, sources in _spelling_variants(column).items():
+            index = np.flatnonzero(original == target)
+            spelled[index] = np.array(sources, dtype=object)[rng.integers(0, len(sources), len(index))]
+        df[column] = spelled
+
+    tcs = base.copy()
+    tems = base.copy()
+    for df in (tcs, tems):
+        for column in ('설치업체', '단속형태', '장비운영상태'):
+            spell(df, column)
+
+    # 한쪽 값 변경 (불일치)
+    changed = np.flatnonzero(rng.random(rows) < mismatch_rate)
+    fields = rng.choice(['설치지점', '제한속도', '관할경찰서', '정상운영일'], len(changed))
+    for field in np.unique(fields):
+        index = changed[fields == field]
+        if field == '설치지점':
+            tems.loc[index, field] = tems.loc[index, field] + ' 앞'
+        elif field == '제한속도':
+            tems.loc[index, field] = tems.loc[index, field] + 10
+        elif field == '관할경찰서':
+            tems.loc[index, field] = '양산경찰서'
+        else:
+            tems.loc[index, field] = tems.loc[index, field] + pd.Timedelta(days=1)
+
+    tcs['정상운영일'] = tcs['정상운영일'].dt.strftime('%Y.%m.%d')
+    tems['정상운영일'] = tems['정상운영일'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    tcs = tcs[rng.random(rows) >= missing_rate].rename(columns=TCS_SOURCE_COLUMNS)
+    tems = tems[rng.random(rows) >= missing_rate].rename(columns=TEMS_SOURCE_COLUMNS)
+    return tcs.reset_index(drop=True), tems.reset_index(drop=True)
+
+
+# 합성 엑셀 생성: python -m benchmarks.generate --rows 10000 --out 단속.xlsx [--inventory 지역]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='합성 단속 데이터 / TCS·TEMS 장비 목록 엑셀을 만듭니다.')
+    parser.add_argument('--rows', type=int, default=10000, help='행 수')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--out', default='synthetic_violations.xlsx', help='단속 데이터 엑셀 경로')
+    parser.add_argument('--inventory', default=None, help='지정하면 <값>_TCS.xlsx / <값>_TEMS.xlsx 장비 목록 쌍을 만듦')
+    parser.add_argument('--mismatch-rate', type=float, default=0.05, help='장비 목록 불일치 비율')
+    args = parser.parse_args(argv)
+
+    if args.inventory:
+        tcs, tems = generate_inventory_pair(args.rows, args.mismatch_rate, seed=args.seed)
+        tcs.to_excel(f'{args.inventory}_TCS.xlsx', index=False)
+        tems.to_excel(f'{args.inventory}_TEMS.xlsx', index=False)
+        print(f"{args.inventory}_TCS.xlsx ({len(tcs)}대), {args.inventory}_TEMS.xlsx ({len(tems)}대)")
+    else:
+        generate_violations(args.rows, seed=args.seed).to_excel(args.out, index=False)
+        print(f"{args.out} ({args.rows}건)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.generate import MAX_EQUIPMENT, generate_inventory_pair, generate_violations
+from mts_core.anomaly import detect_anomalies
+from mts_core.cache import result_cache
+from mts_core.compare import compare_inventories, difference_table, prepare_tcs, prepare_tems
+from mts_core.ledger import ingest_batches
+from mts_core.queries import ALL_OPTION, get_date_bounds, load_violations, summary_table
+from mts_core.storage import create_database, iter_record_batches
+
+BENCHMARKS = ['ingest', 'full_load', 'filtered_summary', 'anomaly', 'tcs_tems_diff']
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# 기준 대비 이 비율 이상 느려지면 성능 저하로 판단 (짧은 측정의 잡음은 NOISE_FLOOR초까지 무시)
+DEFAULT_TOLERANCE = 0.2
+NOISE_FLOOR = 0.05
+
+FILTERS = {'위반유형': '신호위반', '처리상태': ALL_OPTION, '장소구분': '스쿨존'}
+
+
+# 여러 번 실행해 가장 빠른 시간 (초)
+def _best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# 한 크기에 대해 선택한 항목 측정, {항목: {'seconds', 'rows'}}
+def run_size(rows, work_dir, seed=0, repeat=3, only=None):
+    only = only or BENCHMARKS
+    results = {}
+    df = generate_violations(rows, seed=seed)
+    db_path = os.path.join(work_dir, f'bench_{rows}.db')
+    create_database(db_path)
+
+    # 적재는 매번 새 DB가 필요하므로 한 번만 측정
+    started = time.perf_counter()
+    ingest_batches(f'benchmark-{rows}-{seed}', 'synthetic.xlsx', iter_record_batches(df), db_path=db_path)
+    if 'ingest' in only:
+        results['ingest'] = {'seconds': time.perf_counter() - started, 'rows': rows}
+
+    start_date, end_date = get_date_bounds(db_path=db_path)
+
+    def full_load():
+        result_cache.clear()
+        load_violations(start_date, end_date, db_path=db_path)
+
+    def filtered_summary():
+        result_cache.clear()
+        summary_table(start_date, end_date, FILTERS, db_path=db_path)
+
+    recent_counts = df.groupby(df['일련번호'].str[:5])['일련번호'].nunique()
+
+    def anomaly():
+        detect_anomalies(recent_counts, db_path=db_path)
+
+    inventory_rows = min(rows, MAX_EQUIPMENT)
+    tcs, tems = generate_inventory_pair(inventory_rows, seed=seed)
+
+    def tcs_tems_diff():
+        difference_table(compare_inventories(prepare_tcs(tcs), prepare_tems(tems)))
+
+    for name, func, measured_rows in (('full_load', full_load, rows), ('filtered_summary', filtered_summary, rows),
+                                      ('anomaly', anomaly, rows), ('tcs_tems_diff', tcs_tems_diff, inventory_rows)):
+        if name in only:
+            results[name] = {'seconds': _best_time(func, repeat), 'rows': measured_rows}
+    result_cache.clear()
+    return results
+
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'measured_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+# 기준 결과와 비교해 느려진 항목 목록 [(크기, 항목, 기준초, 현재초)]
+def find_regressions(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for size, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            if result['seconds'] > base['seconds'] * (1 + tolerance) and result['seconds'] - base['seconds'] > NOISE_FLOOR:
+                regressions.append((size, name, base['seconds'], result['seconds']))
+    return regressions
+
+
+# 성능 측정: python -m benchmarks.run [--sizes 10000 100000] [--output 결과.json] [--baseline 기준.json]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='합성 데이터로 적재/조회/집계/이상치 탐지/TCS·TEMS 비교 성능을 측정합니다.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='측정할 행 수')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=None, help='측정할 항목')
+    parser.add_argument('--repeat', type=int, default=3, help='조회 항목 반복 횟수 (가장 빠른 값 사용)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--output', default=None, help='결과를 저장할 JSON 경로 (기준 결과로 사용)')
+    parser.add_argument('--baseline', default=None, help='비교할 기준 결과 JSON 경로')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='허용 성능 저하 비율')
+    args = parser.parse_args(argv)
+
+    report = {'environment': _environment(), 'seed': args.seed, 'results': {}}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.sizes:
+            report['results'][str(rows)] = run_size(rows, work_dir, seed=args.seed, repeat=args.repeat, only=args.only)
+            for name, result in report['results'][str(rows)].items():
+                print(f"{rows:>9}행  {name:<17} {result['seconds']:8.3f}초  ({result['rows']}행)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(baseline, report, args.tolerance)
+        for size, name, before, after in regressions:
+            print(f"성능 저하: {size}행 {name} {before:.3f}초 -> {after:.3f}초")
+        if regressions:
+            sys.exit(1)
+        print("기준 대비 성능 저하 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# 단속장비 관리, 분석 도구 공용 모듈 (Streamlit 화면과 무관한 처리 로직)
@@ -0,0 +1,39 @@
+import importlib
+import sys
+
+# 명령 이름 -> main(argv)가 있는 모듈 (실행할 명령의 모듈만 불러옴)
+COMMANDS = {
+    'ingest': ('mts_core.batch_ingest', '여러 엑셀/디렉터리 병렬 일괄 적재'),
+    'summary': ('mts_core.queries', '기간/필터별 단속 건수 요약'),
+    'reconcile': ('mts_core.reconcile', '지역별 TCS/TEMS 일괄 비교'),
+    'archive': ('mts_core.archive', 'violations 테이블로 Parquet 보관소 재생성'),
+    'rollup': ('mts_core.rollup', '일자별 집계 테이블 재생성'),
+    'migrate': ('mts_core.migrations', '스키마 업그레이드 및 중복 행 정리'),
+}
+
+
+def _usage():
+    lines = ['사용법: python -m mts_core <명령> [옵션...]', '', '명령:']
+    lines += [f'  {name:<10} {description}' for name, (_, description) in COMMANDS.items()]
+    lines.append('')
+    lines.append('명령별 옵션: python -m mts_core <명령> --help')
+    return '\n'.join(lines)
+
+
+# 화면 없이 쓰는 명령 모음: python -m mts_core <명령> [옵션...]
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(_usage())
+        return
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"알 수 없는 명령입니다: {name}\n\n{_usage()}", file=sys.stderr)
+        sys.exit(2)
+    module = importlib.import_module(COMMANDS[name][0])
+    sys.argv[0] = f'python -m mts_core {name}'
+    module.main(args)
+
+
+if __name__ == '__main__':
+    main()
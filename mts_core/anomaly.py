@@ -0,0 +1,135 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from mts_core.instrument import timed
+
+# 이동 창 길이(일)와 이상치 기준 표준편차 배수
+DEFAULT_WINDOW = 7
+DEFAULT_SIGMA = 2.0
+
+
+def ensure_anomaly_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS equipment_stats (
+            장비코드 TEXT NOT NULL,
+            window_days INTEGER NOT NULL,
+            window_end TEXT NOT NULL,
+            건수합 INTEGER NOT NULL,
+            제곱합 INTEGER NOT NULL,
+            평균 REAL NOT NULL,
+            표준편차 REAL NOT NULL,
+            PRIMARY KEY (장비코드, window_days)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS anomaly_alerts (
+            장비코드 TEXT NOT NULL,
+            window_days INTEGER NOT NULL,
+            sigma REAL NOT NULL,
+            window_end TEXT NOT NULL,
+            단속건수 INTEGER NOT NULL,
+            임계값 REAL NOT NULL,
+            evaluated_at TEXT NOT NULL,
+            PRIMARY KEY (장비코드, window_days, sigma, window_end)
+        )
+    ''')
+
+
+# 장비별 최근 window개 날짜의 건수 합/제곱합으로 평균과 표본표준편차 갱신
+# (전체 이력 대신 일자별 집계의 최근 창만 읽음, equipment_codes가 있으면 해당 장비만 다시 계산)
+def refresh_equipment_stats(conn, window=DEFAULT_WINDOW, equipment_codes=None):
+    ensure_anomaly_schema(conn)
+    dates = [row[0] for row in conn.execute(
+        'SELECT DISTINCT 날짜 FROM daily_rollup ORDER BY 날짜 DESC LIMIT ?', (window,)
+    )]
+    if len(dates) < window:
+        conn.execute('DELETE FROM equipment_stats WHERE window_days = ?', (window,))  # 기간이 짧으면 기준 없음
+        return
+    window_end, window_start = dates[0], dates[-1]
+
+    previous_end = conn.execute('SELECT max(window_end) FROM equipment_stats WHERE window_days = ?', (window,)).fetchone()[0]
+    if previous_end != window_end:
+        equipment_codes = None  # 창이 이동하면 전체 장비 재계산
+    if equipment_codes is None:
+        conn.execute('DELETE FROM equipment_stats WHERE window_days = ?', (window,))
+        codes = [row[0] for row in conn.execute('SELECT DISTINCT 장비코드 FROM daily_rollup')]
+    else:
+        codes = list(equipment_codes)
+    if not codes:
+        return
+
+    sums = {}
+    for start in range(0, len(codes), 500):
+        chunk = codes[start:start + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        for code, total, squares in conn.execute(f'''
+            SELECT 장비코드, SUM(건수), SUM(건수 * 건수) FROM (
+                SELECT 장비코드, 날짜, SUM(건수) AS 건수
+                FROM daily_rollup
+                WHERE 날짜 >= ? AND 장비코드 IN ({placeholders})
+                GROUP BY 장비코드, 날짜
+            ) GROUP BY 장비코드
+        ''', [window_start] + chunk):
+            sums[code] = (total, squares)
+
+    total = np.array([sums.get(code, (0, 0))[0] for code in codes], dtype=float)
+    squares = np.array([sums.get(code, (0, 0))[1] for code in codes], dtype=float)
+    mean = total / window
+    std = np.sqrt(np.clip((squares - total * total / window) / (window - 1), 0, None))
+    conn.executemany('''
+        INSERT OR REPLACE INTO equipment_stats (장비코드, window_days, window_end, 건수합, 제곱합, 평균, 표준편차)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', zip(codes, [window] * len(codes), [window_end] * len(codes),
+             total.astype(int).tolist(), squares.astype(int).tolist(), mean.tolist(), std.tolist()))
+
+
+# 적재 후 신규 행의 장비만 통계 갱신 (저장된 모든 창 길이에 대해)
+def refresh_after_insert(conn, after_rowid):
+    ensure_anomaly_schema(conn)
+    codes = [row[0] for row in conn.execute('SELECT DISTINCT 장비코드 FROM violations WHERE rowid > ?', (after_rowid,))]
+    windows = {DEFAULT_WINDOW} | {row[0] for row in conn.execute('SELECT DISTINCT window_days FROM equipment_stats')}
+    for window in windows:
+        refresh_equipment_stats(conn, window, codes)
+
+
+# 되돌리기/초기화 후 전체 장비 통계 재계산
+def refresh_all(conn):
+    ensure_anomaly_schema(conn)
+    windows = {DEFAULT_WINDOW} | {row[0] for row in conn.execute('SELECT DISTINCT window_days FROM equipment_stats')}
+    for window in windows:
+        refresh_equipment_stats(conn, window)
+
+
+# 선택 기간의 장비별 건수를 저장된 통계와 한 번에 비교해 이상치 장비 반환 및 결과 저장
+@timed('이상치 탐지')
+def detect_anomalies(recent_counts, window=DEFAULT_WINDOW, sigma=DEFAULT_SIGMA, db_path=None):
+    from mts_core.storage import connect
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            ensure_anomaly_schema(conn)
+            if not conn.execute('SELECT 1 FROM equipment_stats WHERE window_days = ? LIMIT 1', (window,)).fetchone():
+                refresh_equipment_stats(conn, window)
+            stats = pd.read_sql(
+                'SELECT 장비코드, window_end, 평균, 표준편차 FROM equipment_stats WHERE window_days = ?',
+                conn, params=(window,)
+            ).set_index('장비코드')
+            recent = pd.DataFrame({'단속 건수': recent_counts.to_numpy()}, index=recent_counts.index.astype(str))
+            df = recent.join(stats, how='inner')
+            df['임계값'] = df['평균'] + sigma * df['표준편차']  # 이동 평균 + sigma × 표준편차
+            alerts = df[df['단속 건수'] > df['임계값']]
+            if not alerts.empty:
+                evaluated_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                conn.executemany('''
+                    INSERT OR REPLACE INTO anomaly_alerts (장비코드, window_days, sigma, window_end, 단속건수, 임계값, evaluated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(code, window, sigma, window_end, int(count), float(threshold), evaluated_at)
+                      for code, window_end, count, threshold
+                      in zip(alerts.index, alerts['window_end'], alerts['단속 건수'], alerts['임계값'])])
+    finally:
+        conn.close()
+    alerts = alerts.reset_index(names='장비코드')
+    return alerts[['장비코드', '단속 건수', '임계값']]
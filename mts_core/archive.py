@@ -0,0 +1,242 @@
+import argparse
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+from mts_core.storage import DB_PATH, REQUIRED_COLUMNS, connect, create_database
+
+# Parquet 보관소 사용 여부와 위치 (pyarrow 설치 시에만 동작)
+ARCHIVE_ENABLED = os.environ.get('MTS_ARCHIVE', '0') == '1'
+ARCHIVE_DIR = os.environ.get('MTS_ARCHIVE_DIR', 'archive')
+
+ARCHIVE_COLUMNS = REQUIRED_COLUMNS + ['장비코드', 'ingest_id']
+
+# 보관소가 반영한 데이터 버전 기록 파일
+_VERSION_FILE = '_data_version'
+
+
+def archive_available():
+    if not ARCHIVE_ENABLED:
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _violations_dir(archive_dir):
+    return os.path.join(archive_dir or ARCHIVE_DIR, 'violations')
+
+
+def _read_archive_version(archive_dir):
+    try:
+        with open(os.path.join(_violations_dir(archive_dir), _VERSION_FILE)) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_archive_version(archive_dir, version):
+    path = _violations_dir(archive_dir)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, _VERSION_FILE), 'w') as f:
+        f.write(str(version))
+
+
+def _current_version(conn):
+    row = conn.execute("SELECT value FROM db_meta WHERE key = 'data_version'").fetchone()
+    return row[0] if row else 0
+
+
+# 보관소가 DB와 같은 데이터 버전인지 (다르면 SQLite에서 조회)
+def archive_is_current(db_path=None, archive_dir=None):
+    if not archive_available():
+        return False
+    conn = connect(db_path)
+    try:
+        return _read_archive_version(archive_dir) == _current_version(conn)
+    finally:
+        conn.close()
+
+
+def _schema():
+    import pyarrow as pa
+
+    fields = []
+    for col in ARCHIVE_COLUMNS:
+        if col == '위반일시':
+            fields.append(pa.field(col, pa.timestamp('ms')))
+        elif col in ('제한속도', '실제주행속도', '실제초과속도', '고지주행속도', '고지초과속도', '위반차로', 'ingest_id'):
+            fields.append(pa.field(col, pa.int64()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+# 데이터프레임을 월별 파티션(month=YYYY-MM)의 Parquet 파일로 기록
+def _write_partitions(df, archive_dir, tag):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.copy()
+    df['위반일시'] = pd.to_datetime(df['위반일시'], errors='coerce')
+    months = df['위반일시'].dt.strftime('%Y-%m').fillna('unknown')
+    schema = _schema()
+    for month, part in df.groupby(months, sort=False):
+        path = os.path.join(_violations_dir(archive_dir), f'month={month}')
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pandas(part[ARCHIVE_COLUMNS], schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(path, f'part-{tag}.parquet'))
+
+
+def _part_tag(ingest_id):
+    if ingest_id is not None:
+        return f'ingest{ingest_id}'
+    return f'batch-{uuid.uuid4().hex}'
+
+
+# 커밋된 신규 행(rowid > after_rowid)을 보관소에 복제 (SQLite가 중복 제거 기준)
+def mirror_new_rows(conn, after_rowid, ingest_id=None, archive_dir=None):
+    if not archive_available():
+        return
+    version = _current_version(conn)
+    archived_version = _read_archive_version(archive_dir)
+    if archived_version is None and after_rowid == 0:
+        archived_version = version - 1  # 빈 DB에서 시작하는 보관소
+    if archived_version != version - 1:
+        return  # 이미 어긋난 보관소는 rebuild_archive로 다시 만들어야 함
+    df = pd.read_sql(
+        f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM violations WHERE rowid > ?", conn, params=(after_rowid,)
+    )
+    if not df.empty:
+        _write_partitions(df, archive_dir, _part_tag(ingest_id))
+    _write_archive_version(archive_dir, version)
+
+
+# 적재 되돌리기 시 해당 적재분 행을 모든 파티션에서 제거
+# (rebuild_archive로 만든 part-rebuild 파일에도 섞여 있으므로 적재별 파일만 지우면 안 됨)
+def remove_ingest(conn, ingest_id, archive_dir=None):
+    if not archive_available():
+        return
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    version = _current_version(conn)
+    in_sync = _read_archive_version(archive_dir) == version - 1
+    root = _violations_dir(archive_dir)
+    if os.path.isdir(root):
+        for partition in os.listdir(root):
+            directory = os.path.join(root, partition)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if name == f'part-ingest{ingest_id}.parquet':
+                    os.remove(path)
+                    continue
+                if not name.endswith('.parquet'):
+                    continue
+                table = pq.read_table(path)
+                keep = pc.invert(pc.fill_null(pc.equal(table['ingest_id'], ingest_id), False))
+                if pc.all(keep).as_py():
+                    continue
+                table = table.filter(keep)
+                if table.num_rows:
+                    pq.write_table(table, path)
+                else:
+                    os.remove(path)
+    if in_sync:
+        _write_archive_version(archive_dir, version)
+
+
+# 전체 DB 삭제 시 보관소도 비움
+def reset_archive(conn, archive_dir=None):
+    if not archive_available():
+        return
+    shutil.rmtree(_violations_dir(archive_dir), ignore_errors=True)
+    _write_archive_version(archive_dir, _current_version(conn))
+
+
+# SQLite 전체 데이터로 보관소를 다시 생성 (월 단위로 나눠 기록)
+def rebuild_archive(db_path=None, archive_dir=None):
+    shutil.rmtree(_violations_dir(archive_dir), ignore_errors=True)
+    conn = connect(db_path)
+    try:
+        version = _current_version(conn)
+        months = [row[0] for row in conn.execute('SELECT DISTINCT substr(위반일시, 1, 7) FROM violations')]
+        total = 0
+        for month in months:
+            df = pd.read_sql(
+                f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM violations WHERE substr(위반일시, 1, 7) IS ?",
+                conn, params=(month,)
+            )
+            _write_partitions(df, archive_dir, 'rebuild')
+            total += len(df)
+    finally:
+        conn.close()
+    _write_archive_version(archive_dir, version)
+    return total
+
+
+def _filter_expression(start_date, end_date, filters, equipment_code):
+    import pyarrow.dataset as ds
+
+    expression = None
+
+    def add(condition):
+        nonlocal expression
+        expression = condition if expression is None else expression & condition
+
+    # 월 파티션 가지치기 + 위반일시 범위
+    if start_date is not None:
+        add(ds.field('month') >= start_date.strftime('%Y-%m'))
+        add(ds.field('위반일시') >= pd.Timestamp(start_date))
+    if end_date is not None:
+        add(ds.field('month') <= end_date.strftime('%Y-%m'))
+        add(ds.field('위반일시') < pd.Timestamp(end_date) + pd.Timedelta(days=1))
+    for col, value in (filters or {}).items():
+        if value is None or value == '전체':
+            continue
+        add(ds.field(col) == value)
+    if equipment_code:
+        add(ds.field('장비코드') == equipment_code)
+    return expression
+
+
+# 보관소에서 필요한 열과 기간 파티션만 읽기 (메모리 맵 사용)
+def load_archive(start_date=None, end_date=None, filters=None, columns=None, equipment_code=None, archive_dir=None):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    dataset = ds.dataset(
+        _violations_dir(archive_dir), format='parquet',
+        partitioning=ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive'),
+        filesystem=fs.LocalFileSystem(use_mmap=True), exclude_invalid_files=True,
+        ignore_prefixes=['_', '.'],
+    )
+    columns = list(columns or REQUIRED_COLUMNS + ['장비코드'])
+    table = dataset.to_table(columns=columns, filter=_filter_expression(start_date, end_date, filters, equipment_code))
+    df = table.to_pandas()
+    if '위반일시' in df.columns:
+        df['위반일시'] = df['위반일시'].astype('datetime64[ns]')
+    return df
+
+
+# 기존 DB로 보관소 생성: MTS_ARCHIVE=1 python -m mts_core.archive [--db 경로] [--dir 보관소]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='violations 테이블을 월별 Parquet 보관소로 다시 만듭니다.')
+    parser.add_argument('--db', default=DB_PATH, help='데이터베이스 파일 경로')
+    parser.add_argument('--dir', default=ARCHIVE_DIR, help='Parquet 보관소 경로')
+    args = parser.parse_args(argv)
+
+    create_database(args.db)
+    total = rebuild_archive(args.db, args.dir)
+    print(f"보관소에 {total}건 기록 ({args.dir})")
+
+
+if __name__ == '__main__':
+    main()
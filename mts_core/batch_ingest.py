@@ -0,0 +1,143 @@
+import argparse
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from mts_core.excel_stream import validate_header
+from mts_core.ledger import file_hash, find_ingest, ingest_batches
+from mts_core.storage import DB_PATH, REQUIRED_COLUMNS, create_database, iter_record_batches
+
+# 결과 표 열 이름
+REPORT_COLUMNS = {
+    'file_name': '파일명', 'rows': '전체건수', 'batch_duplicates': '배치내중복', 'inserted': '신규건수',
+    'ignored': 'DB중복', 'ingest_id': '적재번호', 'note': '비고', 'error': '오류',
+}
+
+
+# 디렉터리는 안의 *.xlsx (하위 디렉터리 포함, 엑셀 임시 파일 제외), 파일은 그대로
+def find_workbooks(paths):
+    workbooks = []
+    for path in paths:
+        if os.path.isdir(path):
+            workbooks += [str(p) for p in sorted(Path(path).rglob('*.xlsx')) if not p.name.startswith('~$')]
+        else:
+            workbooks.append(str(path))
+    return workbooks
+
+
+# 엑셀 하나를 읽어 필수 열만 남긴 데이터프레임 (프로세스 풀에서 실행)
+def parse_workbook(path):
+    with open(path, 'rb') as f:
+        df = pd.read_excel(io.BytesIO(f.read()))
+    validate_header(list(df.columns))
+    df.columns = [str(col).strip() for col in df.columns]
+    return df[REQUIRED_COLUMNS]
+
+
+# 앞선 파일(또는 같은 파일 앞쪽)에 이미 나온 일련번호 행 제거, (남은 행, 제거한 행 수, 새 일련번호)
+# 새 일련번호는 적재에 성공한 뒤에 seen에 추가 (실패한 파일의 행을 뒤 파일에서 버리지 않도록)
+def drop_batch_duplicates(df, seen):
+    keys = df['일련번호']
+    duplicated = keys.notna() & (keys.duplicated() | keys.isin(seen))
+    return df[~duplicated], int(duplicated.sum()), set(keys[~duplicated].dropna())
+
+
+def _parse_results(paths, workers):
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield parse_workbook(path), None
+            except Exception as e:
+                yield None, e
+        return
+    # Streamlit 서버의 작업 스레드에서도 안전하도록 fork 대신 spawn
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(parse_workbook, path) for path in paths]
+        for future in futures:
+            try:
+                yield future.result(), None
+            except Exception as e:
+                yield None, e
+
+
+# 여러 엑셀을 병렬로 읽고, 배치 전체에서 일련번호 중복을 제거한 뒤 이 프로세스 하나에서 파일별로 적재
+# on_result(순번, 결과)는 파일 하나를 적재(또는 건너뛰기/실패)할 때마다 호출, 파일별 결과 목록 반환
+def ingest_workbooks(paths, names=None, db_path=None, workers=None, on_result=None):
+    names = names or [os.path.basename(path) for path in paths]
+    reports = [{'path': path, 'file_name': name, 'rows': None, 'batch_duplicates': None, 'inserted': None,
+                'ignored': None, 'ingest_id': None, 'note': None, 'error': None} for path, name in zip(paths, names)]
+
+    def finish(index, **values):
+        reports[index].update(values)
+        if on_result is not None:
+            on_result(index, reports[index])
+
+    # 이미 적재된 파일과 배치 안의 같은 파일은 읽지 않음
+    pending = []
+    digests = {}
+    for index, path in enumerate(paths):
+        try:
+            with open(path, 'rb') as f:
+                digest = file_hash(f.read())
+        except OSError as e:
+            finish(index, error=f"{type(e).__name__}: {e}")
+            continue
+        previous = find_ingest(digest, db_path)
+        if previous is not None:
+            finish(index, rows=previous['row_count'], ingest_id=previous['ingest_id'], note='이미 적재된 파일')
+        elif digest in digests:
+            finish(index, note=f"같은 파일: {reports[digests[digest]]['file_name']}")
+        else:
+            digests[digest] = index
+            pending.append((index, digest))
+
+    seen = set()
+    results = _parse_results([paths[index] for index, _ in pending], workers)
+    for (index, digest), (df, error) in zip(pending, results):
+        if error is not None:
+            finish(index, error=f"{type(error).__name__}: {error}")
+            continue
+        rows = len(df)
+        df, duplicates, keys = drop_batch_duplicates(df, seen)
+        try:
+            report = ingest_batches(digest, reports[index]['file_name'], iter_record_batches(df), db_path=db_path)
+        except Exception as e:
+            finish(index, rows=rows, error=f"{type(e).__name__}: {e}")
+            continue
+        seen.update(keys)
+        finish(index, rows=rows, batch_duplicates=duplicates, inserted=report['inserted'],
+               ignored=report['ignored'], ingest_id=report['ingest_id'])
+    return reports
+
+
+# 파일별 결과 표 (화면/명령줄 출력용 열 이름)
+def report_table(reports):
+    df = pd.DataFrame(reports, columns=['path'] + list(REPORT_COLUMNS))
+    df = df.drop(columns='path').astype({col: 'Int64' for col in ('rows', 'batch_duplicates', 'inserted', 'ignored', 'ingest_id')})
+    return df.rename(columns=REPORT_COLUMNS)
+
+
+# 여러 엑셀 일괄 적재: python -m mts_core ingest <파일|디렉터리>... [--db 경로] [--workers N]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='단속 엑셀 여러 개(또는 디렉터리)를 병렬로 읽어 중복을 제거한 뒤 적재합니다.')
+    parser.add_argument('paths', nargs='+', help='엑셀 파일 또는 *.xlsx 파일이 있는 디렉터리')
+    parser.add_argument('--db', default=DB_PATH, help='데이터베이스 파일 경로')
+    parser.add_argument('--workers', type=int, default=None, help='엑셀을 읽을 프로세스 수 (기본: CPU 수)')
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.paths)
+    if not paths:
+        parser.error('적재할 엑셀 파일이 없습니다.')
+    create_database(args.db)
+    table = report_table(ingest_workbooks(paths, db_path=args.db, workers=args.workers))
+    print(table.to_string(index=False))
+    print(f"{len(table)}개 파일, 신규 {int(table['신규건수'].sum())}건, 배치내 중복 {int(table['배치내중복'].sum())}건, 오류 {int(table['오류'].notna().sum())}개")
+
+
+if __name__ == '__main__':
+    main()
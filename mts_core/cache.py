@@ -0,0 +1,126 @@
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from mts_core.storage import get_data_version
+
+# 캐시에 보관할 최대 결과 수
+DEFAULT_MAX_ENTRIES = int(os.environ.get('MTS_CACHE_ENTRIES', 64))
+
+# 조회 결과 캐시의 최대 메모리 (MB, 데이터프레임은 memory_usage(deep=True) 기준)
+DEFAULT_MAX_MB = float(os.environ.get('MTS_CACHE_MB', 256))
+
+
+# 결과가 차지하는 메모리 (바이트, 데이터프레임/시리즈만 계산)
+def result_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(result_bytes(item) for item in value)
+    return 0
+
+
+# 크기 제한이 있는 LRU 결과 캐시 (Streamlit 세션 간 공유, 스레드 안전)
+# max_bytes가 있으면 결과 메모리 합계도 제한 (한도보다 큰 결과는 보관하지 않음)
+class ResultCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def set(self, key, value):
+        size = result_bytes(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._total_bytes > self.max_bytes):
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self._total_bytes -= self._sizes.pop(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'bytes': self._total_bytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+result_cache = ResultCache(max_bytes=int(DEFAULT_MAX_MB * 1024 * 1024))
+
+_MISSING = object()
+
+
+# 캐시 키로 쓸 수 있도록 dict/list 인자를 튜플로 변환
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# 열 추가/교체는 캐시에 영향을 주지 않는 얕은 복사본 반환 (데이터는 캐시와 공유하므로 값을 직접 고치지 말 것)
+def _copy_result(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_copy_result(item) for item in value)
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    return value
+
+
+# 데이터 버전 + 인자를 키로 조회 결과를 캐시하는 데코레이터 (데이터가 바뀌면 자동으로 새로 조회)
+# 인자는 시그니처에 맞춰 정리하므로 db_path를 위치 인자로 넘겨도 그 DB의 버전을 확인
+def cached_query(func):
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        db_path = bound.arguments.get('db_path')
+        version = get_data_version(db_path)
+        key = (func.__module__, func.__name__, db_path, version, _freeze(bound.arguments))
+        result = result_cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            result_cache.set(key, result)
+        return _copy_result(result)
+    return wrapper
@@ -0,0 +1,146 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = "http://api.data.go.kr/openapi/tn_pubr_public_unmanned_traffic_camera_api"
+SERVICE_KEY = "2ReGLeF8d8+JQrzLO3u3VGwVQ58Fi6mZVAogLJ3OBSmCTAfvjKs2dObu+juc2BSS4jdNlo1Q/o0du+b8z9SuKQ=="
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_TIMEOUT = (3.05, 10)  # (연결, 응답) 초
+DEFAULT_WORKERS = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# 정상 응답의 header.resultCode
+SUCCESS_CODE = '00'
+
+
+class CameraApiError(RuntimeError):
+    pass
+
+
+# 시도명 자동 보정
+def correct_region_name(input_name):
+    region_mapping = {
+        '서울': '서울특별시',
+        '부산': '부산광역시',
+        '울산': '울산광역시',
+        '대전': '대전광역시',
+        '대구': '대구광역시',
+        '광주': '광주광역시',
+        '인천': '인천광역시',
+        '전라북도': '전북',
+        '전라남도': '전남',
+        '경상남도': '경남',
+        '경상북도': '경북',
+        '충청북도': '충북',
+        '충청남도': '충남',
+        '강원도': '강원',
+        '경기도': '경기',
+        # 필요에 따라 더 많은 지역 추가
+    }
+    return region_mapping.get(input_name, input_name)
+
+
+# 조회 조건을 API 파라미터로 변환 (장비코드가 있으면 장비코드로만 조회)
+def build_query(city=None, district=None, equipment_code=None):
+    if equipment_code:
+        return {'mnlssRegltCameraManageNo': equipment_code}
+    query = {}
+    if city:
+        query['ctprvnNm'] = correct_region_name(city)
+    if district:
+        query['signguNm'] = district
+    return query
+
+
+# 응답 본문 -> (항목 목록, 전체 건수)
+# 포털은 오류도 HTTP 200에 XML/JSON 본문으로 돌려주므로 본문 형식과 resultCode를 확인
+def parse_page(response):
+    try:
+        payload = response.json()
+    except ValueError as e:
+        raise CameraApiError(f"JSON이 아닌 응답입니다: {response.text[:200]}") from e
+    try:
+        result = payload['response']
+        header = result.get('header') or {}
+        if header.get('resultCode') != SUCCESS_CODE:
+            raise CameraApiError(f"API 오류 {header.get('resultCode')}: {header.get('resultMsg')}")
+        body = result.get('body') or {}
+        items = body.get('items') or []
+        if isinstance(items, dict):
+            items = items.get('item') or []
+        if isinstance(items, dict):
+            items = [items]
+        if not isinstance(items, list):
+            raise TypeError(f"items 형식 오류: {type(items).__name__}")
+        return items, int(body.get('totalCount') or len(items))
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise CameraApiError(f"응답 형식이 올바르지 않습니다: {type(e).__name__}: {e}") from e
+
+
+# 무인 교통단속 카메라 API 클라이언트 (연결 재사용, 페이지 병렬 조회, 재시도/타임아웃)
+class CameraApiClient:
+    def __init__(self, base_url=API_URL, service_key=SERVICE_KEY, page_size=DEFAULT_PAGE_SIZE,
+                 timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF):
+        self.base_url = base_url
+        self.service_key = service_key
+        self.page_size = page_size
+        self.timeout = timeout
+        self.max_workers = max_workers
+        retry = Retry(
+            total=retries, connect=retries, read=retries, backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    # 한 페이지 조회 후 (항목 목록, 전체 건수) 반환 (어떤 실패든 CameraApiError로 통일)
+    def fetch_page(self, query, page_no):
+        params = dict(query, serviceKey=self.service_key, numOfRows=self.page_size, pageNo=page_no, type='json')
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise CameraApiError(str(e)) from e
+        if response.status_code != 200:
+            raise CameraApiError(response.text)
+        return parse_page(response)
+
+
+    # 첫 페이지의 totalCount로 나머지 페이지를 스레드 풀에서 동시에 조회
+    def fetch_all(self, query):
+        items, total_count = self.fetch_page(query, 1)
+        pages = math.ceil(total_count / self.page_size)
+        if pages <= 1:
+            return items
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, pages - 1)) as pool:
+            for page_items in pool.map(lambda page_no: self.fetch_page(query, page_no)[0], range(2, pages + 1)):
+                items.extend(page_items)
+        return items
+
+    def get_camera_data(self, city=None, district=None, equipment_code=None):
+        return self.fetch_all(build_query(city, district, equipment_code))
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+# 프로세스 전체에서 공유하는 기본 클라이언트 (연결 풀 재사용)
+def get_default_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CameraApiClient()
+        return _default_client
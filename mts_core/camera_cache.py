@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+
+from mts_core.camera_api import CameraApiError, build_query, get_default_client
+from mts_core.instrument import timed
+from mts_core.storage import connect
+
+# 카메라 등록 정보는 한 달에 몇 번만 바뀌므로 기본 1일 보관
+DEFAULT_TTL = int(os.environ.get('MTS_CAMERA_CACHE_TTL', 24 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('MTS_CAMERA_CACHE_ENTRIES', 500))
+
+
+def ensure_camera_cache_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS camera_cache (
+            cache_key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+# 조회 조건을 정규화한 캐시 키 (시도명 보정 후 정렬된 JSON)
+def cache_key(city=None, district=None, equipment_code=None):
+    return json.dumps(build_query(city, district, equipment_code), ensure_ascii=False, sort_keys=True)
+
+
+# API 응답을 SQLite에 보관하는 카메라 조회 (TTL, 크기 제한, 만료 데이터 우선 반환 후 백그라운드 갱신)
+class CachedCameraClient:
+    def __init__(self, client=None, db_path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 stale_while_revalidate=True):
+        self.client = client
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        conn = connect(db_path)
+        try:
+            ensure_camera_cache_schema(conn)
+        finally:
+            conn.close()
+
+    def _api(self):
+        return self.client or get_default_client()
+
+    def _lookup(self, key):
+        conn = connect(self.db_path)
+        try:
+            row = conn.execute('SELECT payload, fetched_at FROM camera_cache WHERE cache_key = ?', (key,)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE camera_cache SET last_access = ? WHERE cache_key = ?', (time.time(), key))
+                conn.commit()
+        finally:
+            conn.close()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def _store(self, key, items):
+        now = time.time()
+        conn = connect(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO camera_cache (cache_key, payload, fetched_at, last_access)
+                    VALUES (?, ?, ?, ?)
+                ''', (key, json.dumps(items, ensure_ascii=False), now, now))
+                # 오래 사용하지 않은 항목부터 삭제
+                conn.execute('''
+                    DELETE FROM camera_cache WHERE cache_key NOT IN (
+                        SELECT cache_key FROM camera_cache ORDER BY last_access DESC LIMIT ?
+                    )
+                ''', (self.max_entries,))
+        finally:
+            conn.close()
+        return now
+
+    def _fetch_and_store(self, key, query):
+        items = self._api().fetch_all(query)
+        return items, self._store(key, items)
+
+    def _refresh_in_background(self, key, query):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._fetch_and_store(key, query)
+            except CameraApiError:
+                pass  # 다음 조회 때 다시 시도
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    # (카메라 목록, 조회 정보) 반환. 조회 정보: source('api'/'cache'/'stale'), fetched_at
+    # (API 클라이언트는 연결/응답 형식/resultCode 오류를 모두 CameraApiError로 올리므로 그때는 만료된 데이터 사용)
+    @timed('카메라 API 조회')
+    def get_with_info(self, city=None, district=None, equipment_code=None):
+        key = cache_key(city, district, equipment_code)
+        query = build_query(city, district, equipment_code)
+        items, fetched_at = self._lookup(key)
+        if items is not None and time.time() - fetched_at < self.ttl:
+            return items, {'source': 'cache', 'fetched_at': fetched_at}
+        if items is not None and self.stale_while_revalidate:
+            self._refresh_in_background(key, query)
+            return items, {'source': 'stale', 'fetched_at': fetched_at}
+        try:
+            items, fetched_at = self._fetch_and_store(key, query)
+        except CameraApiError:
+            if items is None:
+                raise
+            return items, {'source': 'stale', 'fetched_at': fetched_at}  # API 장애 시 만료된 데이터 사용
+        return items, {'source': 'api', 'fetched_at': fetched_at}
+
+    def get_camera_data(self, city=None, district=None, equipment_code=None):
+        return self.get_with_info(city, district, equipment_code)[0]
+
+    # 캐시 비우기 (강제 새로고침)
+    def invalidate(self, city=None, district=None, equipment_code=None):
+        conn = connect(self.db_path)
+        try:
+            with conn:
+                conn.execute('DELETE FROM camera_cache WHERE cache_key = ?', (cache_key(city, district, equipment_code),))
+        finally:
+            conn.close()
+
+
+_default_cached_client = None
+_default_cached_client_lock = threading.Lock()
+
+
+def get_default_cached_client():
+    global _default_cached_client
+    with _default_cached_client_lock:
+        if _default_cached_client is None:
+            _default_cached_client = CachedCameraClient()
+        return _default_cached_client
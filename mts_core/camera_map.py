@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from mts_core.cache import ResultCache
+from mts_core.instrument import timed
+
+# 이 대수를 넘으면 개별 마커 대신 클러스터 레이어로 표시
+CLUSTER_THRESHOLD = 500
+
+# 행 [위도, 경도, 팝업번호] 를 브라우저에서 마커로 만드는 함수 (같은 팝업 문구는 한 번만 전송)
+POPUP_CALLBACK = """
+var popups = %s;
+var callback = function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(popups[row[2]]);
+    return marker;
+};
+"""
+
+
+# 팝업 문구 (열 단위로 한 번에 생성)
+def camera_popups(df):
+    return ("단속구분: " + df['regltSe'].astype(str)
+            + "<br>장소: " + df['itlpc'].astype(str)
+            + "<br>제한속도: " + df['lmttVe'].astype(str) + "km/h")
+
+
+# 좌표가 있는 카메라의 [위도, 경도, 팝업번호] 목록과 팝업 문구 목록
+def camera_points(df):
+    lats = pd.to_numeric(df['latitude'], errors='coerce').to_numpy(dtype=float)
+    lons = pd.to_numeric(df['longitude'], errors='coerce').to_numpy(dtype=float)
+    codes, popups = pd.factorize(camera_popups(df))
+    valid = np.isfinite(lats) & np.isfinite(lons)
+    points = [list(row) for row in zip(lats[valid].round(6).tolist(), lons[valid].round(6).tolist(), codes[valid].tolist())]
+    return points, popups.tolist()
+
+
+# 전체 카메라를 하나의 클러스터 레이어로 그린 지도 (folium은 지도를 만들 때 불러옴)
+def build_cluster_map(df, center=None, zoom=12):
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    points, popups = camera_points(df)
+    if center is None:
+        center = [float(np.mean([p[0] for p in points])), float(np.mean([p[1] for p in points]))] if points else [36.5, 127.8]
+    folium_map = folium.Map(location=center, zoom_start=zoom)
+    FastMarkerCluster(points, callback=POPUP_CALLBACK % json.dumps(popups, ensure_ascii=False), name='단속카메라').add_to(folium_map)
+    return folium_map
+
+
+# 지정한 카메라만 개별 마커로 그린 지도
+def build_marker_map(df, center, zoom=12):
+    import folium
+
+    folium_map = folium.Map(location=center, zoom_start=zoom)
+    lats = pd.to_numeric(df['latitude'], errors='coerce')
+    lons = pd.to_numeric(df['longitude'], errors='coerce')
+    for lat, lon, popup in zip(lats, lons, camera_popups(df)):
+        folium.Marker([float(lat), float(lon)], popup=popup).add_to(folium_map)
+    return folium_map
+
+
+_html_cache = ResultCache(max_entries=16)
+
+
+# 클러스터 지도 HTML (조회 조건과 카메라 목록 버전이 같으면 재사용, 버전을 모르면 매번 생성)
+@timed('지도 HTML 생성')
+def cluster_map_html(df, query_key, registry_version):
+    if registry_version is None:
+        return build_cluster_map(df).get_root().render()
+    key = (query_key, registry_version)
+    html = _html_cache.get(key)
+    if html is None:
+        html = build_cluster_map(df).get_root().render()
+        _html_cache.set(key, html)
+    return html
@@ -0,0 +1,87 @@
+import functools
+import io
+import os
+
+from mts_core.cache import ResultCache, _freeze
+from mts_core.instrument import span
+from mts_core.storage import get_data_version
+
+# 한글 폰트 경로
+FONT_PATH = os.path.join(os.getcwd(), 'static/fonts/NanumGothic.ttf')
+CHART_DPI = 200
+BAR_COLOR = 'skyblue'
+
+# 그래프 PNG 캐시 (데이터 버전이 바뀌면 새 키로 다시 그림)
+chart_cache = ResultCache(max_entries=int(os.environ.get('MTS_CHART_CACHE_ENTRIES', 32)))
+
+
+# 폰트 파일은 한 번만 읽음 (matplotlib은 그래프를 처음 그릴 때 불러옴)
+@functools.lru_cache(maxsize=None)
+def get_font_properties(font_path=FONT_PATH):
+    import matplotlib.font_manager as fm
+    return fm.FontProperties(fname=font_path)
+
+
+# pyplot 전역 상태를 쓰지 않는 그림 (닫지 않아도 쌓이지 않음)
+def _new_figure():
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    matplotlib.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+    fig = Figure(figsize=matplotlib.rcParams['figure.figsize'])
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _to_png(fig):
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=CHART_DPI, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+def _label_axes(ax, xlabel, ylabel, title, font_prop):
+    ax.set_xlabel(xlabel, fontproperties=font_prop)
+    ax.set_ylabel(ylabel, fontproperties=font_prop)
+    ax.set_title(title, fontproperties=font_prop)
+    for label in ax.get_xticklabels() + ax.get_yticklabels():
+        label.set_fontproperties(font_prop)
+
+
+# 막대 그래프 PNG (막대 위에 건수 표시)
+def bar_chart_png(counts, xlabel, ylabel, title, font_path=FONT_PATH):
+    font_prop = get_font_properties(font_path)
+    fig, ax = _new_figure()
+    bars = ax.bar(counts.index.astype(str), counts.values, color=BAR_COLOR)
+    _label_axes(ax, xlabel, ylabel, title, font_prop)
+    for bar in bars:
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f'{bar.get_height()}', ha='center', va='bottom', fontproperties=font_prop)
+    return _to_png(fig)
+
+
+# 시간대별 꺾은선 그래프 PNG (0~23시 눈금, 점 위에 건수 표시)
+def hourly_chart_png(counts, xlabel, ylabel, title, font_path=FONT_PATH):
+    font_prop = get_font_properties(font_path)
+    fig, ax = _new_figure()
+    ax.plot(counts.index, counts.values, marker='o', color=BAR_COLOR)
+    ax.set_xticks(range(0, 24, 1))  # 가로축 간격 1시간 단위로 설정
+    ax.set_yticks(range(0, max(counts.values) + 10, 10))  # 세로축 간격 10 단위로 설정
+    _label_axes(ax, xlabel, ylabel, title, font_prop)
+    for x, y in zip(counts.index, counts.values):
+        ax.text(x, y, f'{y}', ha='center', va='bottom', fontproperties=font_prop)
+    return _to_png(fig)
+
+
+# (그래프 이름, 데이터 버전, 조회 조건)별로 한 번만 그림. render는 PNG 바이트를 돌려주는 함수
+def cached_chart(name, query_key, render, db_path=None):
+    with span(f'그래프 {name}'):
+        key = (name, db_path, get_data_version(db_path), _freeze(query_key))
+        png = chart_cache.get(key)
+        if png is None:
+            with span('그래프 그리기'):
+                png = render()
+            chart_cache.set(key, png)
+    return png
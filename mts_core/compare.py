@@ -0,0 +1,190 @@
+import pandas as pd
+
+from mts_core.instrument import timed
+
+# 열 이름 매핑 (특정 열을 새로운 이름으로 매핑)
+TCS_COLUMN_MAPPING = {
+    '장비번호': '장비코드',
+    '운영상태': '장비운영상태',
+    '장비종류': '단속형태',
+    '설치장소': '설치지점',
+    '설치 장소': '설치지점',
+    '관할서': '관할경찰서',
+    '제한속도(소형)': '제한속도',
+    '단속속도(소형)': '단속속도',
+    '최초정상운영시작일': '정상운영일',
+    '제작회사': '설치업체'
+}
+
+TEMS_COLUMN_MAPPING = {
+    '제어기 번호': '장비코드',
+    '제어기모드': '장비운영상태',
+    '제어기 유형': '단속형태',
+    '설치주소': '설치지점',
+    '경찰서 명칭': '관할경찰서',
+    '소형제한속도': '제한속도',
+    '소형단속속도': '단속속도',
+    '설치일시': '정상운영일',
+    '업체명': '설치업체'
+}
+
+# 값 매핑 딕셔너리 (비교 시 사용)
+VALUE_MAPPINGS = {
+    '설치업체': {
+        '토페스': '토페스',
+        '(주)토페스': '토페스',
+        '건아정보': '건아정보기술(주)',
+        '건아정보기술': '건아정보기술(주)',
+        '건아정보(주)': '건아정보기술(주)',
+        '건아기전': '건아정보기술(주)',
+        '건아': '건아정보기술(주)',
+        '건아정보기술(주)': '건아정보기술(주)',
+        '진우산전': '진우ATS',
+        '진우산전(주)': '진우ATS',
+        '진우': '진우ATS',
+        '진우에티에스': '진우ATS',
+        '진우에이티에스': '진우ATS',
+        '유니시큐': '유니시큐',
+        '유니씨큐': '유니시큐',
+        '아몽': '아몽솔루션(주)',
+        '아몽솔루션': '아몽솔루션(주)',
+        '아몽솔류션': '아몽솔루션(주)',
+        '아프로시스': '아프로시스템즈',
+        '아프로': '아프로시스템즈',
+        '아프로시스템': '아프로시스템즈',
+        '알티솔류션': '알티솔루션',
+        '비츠로시스': '비츠로시스(주)',
+        '비츠로시스(주)': '(주)비츠로시스',
+        '하이테콤': '(주)하이테콤',
+        '(주)렉스젠': '렉스젠'
+    },
+    '단속형태': {
+        '과속': '과속제어기',
+        '과속제어기': '과속제어기',
+        '과속 및 신호': '다기능제어기',
+        '다기능제어기': '다기능제어기',
+        '구간단속': '구간제어기',
+        '구간제어기': '구간제어기'
+    },
+    '장비운영상태': {
+        '정상운영': '정상운영',
+        '정상운영모드': '정상운영',
+        '일시정지모드': '정상운영',
+        '시범운영': '시범운영',
+        '시범운영모드': '시범운영',
+        '폐기': '폐기'
+    },
+    '관할경찰서': {
+        '경남고성경찰서': '고성경찰서',
+        '고성 경찰서': '고성경찰서',
+        '고성경찰서': '고성경찰서',
+        '6지구대': '６지구대',
+    }
+}
+
+# 비교할 열 목록 (차이 목록 표시 순서)
+COMPARE_COLUMNS = ['장비운영상태', '단속형태', '설치지점', '설치업체', '제한속도', '단속속도', '정상운영일', '관할경찰서']
+
+# 요약 표의 단속형태 -> 장비 구분
+EQUIPMENT_TYPES = {'과속제어기': '과속장비', '다기능제어기': '다기능장비', '구간제어기': '구간장비'}
+
+DATE_FORMAT = '%Y년 %m월 %d일'
+
+
+# TCS 엑셀: 열 이름 정리/통일, 정상운영일 형식 통일 ('.' 구분 날짜를 '-'로 바꿔 변환)
+def prepare_tcs(df):
+    df = df.copy()
+    df.columns = df.columns.str.replace(r'[\n\r]+', '', regex=True).str.strip()
+    df = df.rename(columns=TCS_COLUMN_MAPPING)
+    df['정상운영일'] = pd.to_datetime(df['정상운영일'].str.replace('.', '-'), errors='coerce').dt.strftime(DATE_FORMAT)
+    return df
+
+
+# TEMS 엑셀: 열 이름 통일, 정상운영일에서 시간 제거 및 형식 통일
+def prepare_tems(df):
+    df = df.rename(columns=TEMS_COLUMN_MAPPING)
+    df['정상운영일'] = pd.to_datetime(df['정상운영일'], errors='coerce').dt.strftime(DATE_FORMAT)
+    return df
+
+
+# 비교할 열의 값을 매핑표로 통일 (열 단위 map, 매핑에 없는 값은 그대로)
+def normalize_values(df, value_mappings=None):
+    value_mappings = VALUE_MAPPINGS if value_mappings is None else value_mappings
+    df = df.copy()
+    for col, mapping in value_mappings.items():
+        if col in df.columns and mapping:
+            df[col] = df[col].map(mapping).fillna(df[col])
+    return df
+
+
+# 매핑 적용 후 '폐기' 장비 제외
+def drop_discarded(df):
+    if '장비운영상태' in df.columns:
+        df = df[df['장비운영상태'] != '폐기']
+    return df
+
+
+# 운영상태 및 단속형태별 TCS/TEMS 장비 대수 요약 표
+def equipment_summary(df_tcs, df_tems):
+    parts = []
+    for label, df in (('TCS', df_tcs), ('TEMS', df_tems)):
+        counts = pd.crosstab(df['장비운영상태'], df['단속형태'])
+        counts = counts.reindex(columns=list(EQUIPMENT_TYPES), fill_value=0)
+        counts.columns = [f'{label} - {name}' for name in EQUIPMENT_TYPES.values()]
+        parts.append(counts)
+    summary = pd.concat(parts, axis=1).fillna(0).astype(int)
+    return summary.rename_axis('운영상태').reset_index()
+
+
+# TCS/TEMS 비교: 매핑, '폐기' 제외, 장비코드 기준 outer join 후 열별 불일치 행렬 계산
+# (양쪽 모두 값이 없으면 같은 값으로 봄, normalizer가 있으면 유사 표기도 통일)
+@timed('TCS/TEMS 비교')
+def compare_inventories(df_tcs, df_tems, value_mappings=None, normalizer=None):
+    if normalizer is not None:
+        df_tcs, df_tems = normalizer.align(df_tcs, df_tems, value_mappings)
+    else:
+        df_tcs = normalize_values(df_tcs, value_mappings)
+        df_tems = normalize_values(df_tems, value_mappings)
+    df_tcs = drop_discarded(df_tcs)
+    df_tems = drop_discarded(df_tems)
+    common_columns = [col for col in COMPARE_COLUMNS if col in df_tcs.columns and col in df_tems.columns]
+    df_tcs = df_tcs[['장비코드'] + common_columns]
+    df_tems = df_tems[['장비코드'] + common_columns]
+    merged = pd.merge(df_tcs, df_tems, on='장비코드', how='outer', suffixes=('_TCS', '_TEMS'))
+
+    tcs_values = merged[[f'{col}_TCS' for col in common_columns]].set_axis(common_columns, axis=1)
+    tems_values = merged[[f'{col}_TEMS' for col in common_columns]].set_axis(common_columns, axis=1)
+    mismatch = tcs_values.ne(tems_values) & ~(tcs_values.isna() & tems_values.isna())
+    return {
+        'tcs': df_tcs,
+        'tems': df_tems,
+        'merged': merged,
+        'common_columns': common_columns,
+        'mismatch': mismatch,
+        'tcs_values': tcs_values,
+        'tems_values': tems_values,
+    }
+
+
+# 차이가 나는 장비 목록 (다른 값은 'TCS값 | TEMS값', 비교할 수 없는 열은 None)
+@timed('차이 목록 생성')
+def difference_table(result):
+    mismatch = result['mismatch']
+    rows = mismatch.any(axis=1)
+    tcs_values = result['tcs_values'][rows]
+    tems_values = result['tems_values'][rows]
+    labels = tcs_values.astype(str) + ' | ' + tems_values.astype(str)
+    differences = tcs_values.astype(object).where(~mismatch[rows], labels)
+    differences.insert(0, '장비코드', result['merged'].loc[rows, '장비코드'])
+    for col in COMPARE_COLUMNS:
+        if col not in differences.columns:
+            differences[col] = None
+    return differences[['장비코드'] + COMPARE_COLUMNS].reset_index(drop=True)
+
+
+# 한 항목이 서로 다른 장비 (장비코드, TCS 값, TEMS 값)
+def field_differences(result, column):
+    if column not in result['common_columns']:
+        return None
+    rows = result['mismatch'][column]
+    return result['merged'].loc[rows, ['장비코드', f'{column}_TCS', f'{column}_TEMS']]
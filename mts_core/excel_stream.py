@@ -0,0 +1,78 @@
+import datetime
+
+from mts_core.storage import DEFAULT_BATCH_SIZE, INTEGER_COLUMNS, REQUIRED_COLUMNS
+
+
+def _to_datetime_text(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def _to_integer(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _identity(value):
+    return value
+
+
+def _column_converter(column):
+    if column == '위반일시':
+        return _to_datetime_text
+    if column in INTEGER_COLUMNS:
+        return _to_integer
+    return _identity
+
+
+# 헤더 행 검증 후 필수 열의 위치 목록 반환
+def validate_header(header):
+    header = [str(name).strip() if name is not None else None for name in header]
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"업로드된 파일에 필수 열이 없습니다: {', '.join(missing)}")
+    return [header.index(col) for col in REQUIRED_COLUMNS]
+
+
+# 엑셀 시트를 한 행씩 읽어 violations 테이블용 레코드 묶음으로 반환 (메모리 사용량 일정)
+def iter_excel_batches(file, batch_size=DEFAULT_BATCH_SIZE):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("업로드된 파일에 데이터가 없습니다.")
+        indices = validate_header(header)
+        converters = [_column_converter(col) for col in REQUIRED_COLUMNS]
+
+        batch = []
+        for row in rows:
+            if not row or all(value is None for value in row):
+                continue
+            batch.append(tuple(
+                convert(row[index]) if index < len(row) else None
+                for index, convert in zip(indices, converters)
+            ))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        workbook.close()
+
+
+# 시트의 데이터 행 수 (머리글 제외, 시트 크기 정보가 없으면 None) - 진행률 표시용
+def count_excel_rows(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        max_row = workbook.active.max_row
+    finally:
+        workbook.close()
+    return max(max_row - 1, 0) if max_row else None
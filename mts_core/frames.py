@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+# 반복되는 값이 많은 문자열 열 (category로 저장)
+CATEGORY_COLUMNS = ['위반유형', '처리상태', '장소구분', '차종', '주민구분', '차명', '위반장소', '장비코드']
+
+# 속도 열 (int16), 차로 열 (uint8)
+SPEED_COLUMNS = ['제한속도', '실제주행속도', '실제초과속도', '고지주행속도', '고지초과속도']
+LANE_COLUMNS = ['위반차로']
+
+
+# 값 범위가 맞을 때만 작은 정수형으로 변환 (결측값이 있으면 nullable 정수형 사용)
+def _downcast_integer(series, dtype, nullable_dtype):
+    if not pd.api.types.is_numeric_dtype(series):
+        return series
+    values = series.dropna()
+    if values.empty:
+        return series.astype(nullable_dtype)
+    if not (values == values.round()).all():
+        return series
+    info = np.iinfo(dtype)
+    if values.min() < info.min or values.max() > info.max:
+        return series
+    if series.isna().any():
+        return series.astype(nullable_dtype)
+    return series.astype(dtype)
+
+
+# 단속 데이터프레임을 메모리를 적게 쓰는 형식으로 변환
+def compact_frame(df):
+    df = df.copy()
+    for col in df.columns:
+        if col == '위반일시':
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col])
+        elif col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in SPEED_COLUMNS:
+            df[col] = _downcast_integer(df[col], np.int16, 'Int16')
+        elif col in LANE_COLUMNS:
+            df[col] = _downcast_integer(df[col], np.uint8, 'UInt8')
+    return df
+
+
+# 열별 메모리 사용량 (문자열 실제 크기 포함)
+def memory_report(df):
+    usage = df.memory_usage(deep=True, index=False)
+    rows = max(len(df), 1)
+    report = pd.DataFrame({
+        '열': usage.index,
+        '형식': [str(df[col].dtype) for col in usage.index],
+        '메모리(KB)': (usage.values / 1024).round(1),
+        '행당 바이트': (usage.values / rows).round(1),
+    })
+    total = pd.DataFrame([{
+        '열': '합계', '형식': '', '메모리(KB)': round(usage.sum() / 1024, 1), '행당 바이트': round(usage.sum() / rows, 1)
+    }])
+    return pd.concat([report, total], ignore_index=True)
+
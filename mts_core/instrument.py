@@ -0,0 +1,219 @@
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import functools
+import io
+import json
+import os
+import pstats
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+# 실행별 측정 결과를 JSON Lines로 남길 파일 (설정한 경우에만)
+PERF_LOG_PATH = os.environ.get('MTS_PERF_LOG')
+
+# 패널/로그에 남길 SQL 문 길이
+STATEMENT_PREVIEW = 120
+
+_current_run = contextvars.ContextVar('mts_current_run', default=None)
+_log_lock = threading.Lock()
+
+
+# 한 번의 스크립트 실행 측정 기록 (구간, SQL 문, 선택적으로 프로파일)
+class PerfRun:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.datetime.now()
+        self._started = time.perf_counter()
+        self.total_seconds = None
+        self.spans = []
+        self.statements = []
+        self.profile_report = None
+        self._depth = 0
+        self._profiler = None
+
+    def add_statement(self, sql, seconds, rows):
+        record = {'sql': ' '.join(sql.split())[:STATEMENT_PREVIEW], 'seconds': seconds, 'rows': rows}
+        self.statements.append(record)
+        return record
+
+    # pyinstrument가 있으면 사용, 없으면 cProfile
+    def start_profiler(self):
+        try:
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+        except ImportError:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profiler(self, limit=40):
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+            self.profile_report = output.getvalue()
+        else:
+            profiler.stop()
+            self.profile_report = profiler.output_text(unicode=True)
+        return self.profile_report
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_seconds': self.total_seconds,
+            'spans': self.spans,
+            'statements': self.statements,
+        }
+
+
+def current_run():
+    return _current_run.get()
+
+
+# 측정 시작 (profile=True면 이번 실행 전체를 프로파일)
+def start_run(name, profile=False):
+    run = PerfRun(name)
+    _current_run.set(run)
+    if profile:
+        run.start_profiler()
+    return run
+
+
+# 측정 종료, 로그 파일이 설정되어 있으면 한 줄 추가
+def finish_run(run, log_path=None):
+    if run is None:
+        return None
+    run.stop_profiler()
+    run.total_seconds = time.perf_counter() - run._started
+    if _current_run.get() is run:
+        _current_run.set(None)
+    log_path = log_path or PERF_LOG_PATH
+    if log_path:
+        with _log_lock, open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run.to_dict(), ensure_ascii=False, default=str) + '\n')
+    return run
+
+
+def _count_rows(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, list)):
+        return len(result)
+    if isinstance(result, tuple) and result:
+        return _count_rows(result[0])
+    if isinstance(result, dict) and 'total' in result:
+        return result['total']
+    return None
+
+
+# 측정 구간 (측정 중이 아니면 아무것도 하지 않음)
+@contextlib.contextmanager
+def span(name, rows=None):
+    run = _current_run.get()
+    if run is None:
+        yield None
+        return
+    record = {'name': name, 'depth': run._depth, 'seconds': None, 'rows': rows}
+    run.spans.append(record)
+    run._depth += 1
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - started
+        run._depth -= 1
+
+
+# 함수 실행을 측정 구간으로 기록 (반환값의 행 수 포함)
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_run.get() is None:
+                return func(*args, **kwargs)
+            with span(name) as record:
+                result = func(*args, **kwargs)
+                record['rows'] = _count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+# SQL 문 실행/조회 시간을 현재 측정에 기록하는 커서
+class TimedCursor(sqlite3.Cursor):
+    _record = None
+
+    def execute(self, sql, *args):
+        run = _current_run.get()
+        if run is None:
+            return super().execute(sql, *args)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            self._record = run.add_statement(sql, time.perf_counter() - started, self.rowcount if self.rowcount >= 0 else None)
+
+    def executemany(self, sql, *args):
+        run = _current_run.get()
+        if run is None:
+            return super().executemany(sql, *args)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            self._record = run.add_statement(sql, time.perf_counter() - started, self.rowcount if self.rowcount >= 0 else None)
+
+    def _timed_fetch(self, fetch, *args):
+        record = self._record
+        if record is None or _current_run.get() is None:
+            return fetch(*args)
+        started = time.perf_counter()
+        rows = fetch(*args)
+        record['seconds'] += time.perf_counter() - started
+        record['rows'] = (record['rows'] or 0) + len(rows)
+        return rows
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(super().fetchmany, *args)
+
+
+# conn.execute/executemany 는 C 구현이라 cursor()를 거치지 않으므로 직접 TimedCursor로 실행
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        return self.cursor().executemany(sql, *args)
+
+
+# 패널용 구간별 표
+def span_table(run):
+    rows = [{'구간': '  ' * span_record['depth'] + span_record['name'],
+             '시간(ms)': round((span_record['seconds'] or 0) * 1000, 1),
+             '행 수': span_record['rows']} for span_record in run.spans]
+    return pd.DataFrame(rows, columns=['구간', '시간(ms)', '행 수']).astype({'행 수': 'Int64'})
+
+
+# 패널용 SQL 문별 합계 표 (느린 순)
+def statement_table(run):
+    if not run.statements:
+        return pd.DataFrame(columns=['SQL', '횟수', '시간(ms)', '행 수'])
+    df = pd.DataFrame(run.statements)
+    summary = df.groupby('sql', sort=False).agg(횟수=('sql', 'size'), seconds=('seconds', 'sum'), 행수=('rows', 'sum'))
+    summary['시간(ms)'] = (summary.pop('seconds') * 1000).round(1)
+    summary = summary.rename(columns={'행수': '행 수'}).sort_values('시간(ms)', ascending=False)
+    summary['행 수'] = summary['행 수'].astype('Int64')
+    return summary.rename_axis('SQL').reset_index()[['SQL', '횟수', '시간(ms)', '행 수']]
@@ -0,0 +1,335 @@
+import datetime
+import os
+import threading
+import traceback
+
+import pandas as pd
+
+from mts_core.excel_stream import count_excel_rows, iter_excel_batches, validate_header
+from mts_core.ledger import file_hash, find_ingest, ingest_batches
+from mts_core.storage import connect, iter_record_batches
+
+# 백그라운드 적재 대기 중인 업로드 파일 저장 위치
+JOB_DIR = os.environ.get('MTS_JOB_DIR', 'ingest_jobs')
+
+# 작업 상태 (DB 값 -> 화면 표시)
+STATUS_LABELS = {'queued': '대기', 'running': '진행중', 'done': '완료', 'failed': '실패'}
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def _now():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def ensure_jobs_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_hash TEXT NOT NULL,
+            file_name TEXT,
+            file_path TEXT NOT NULL,
+            streaming INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            total_rows INTEGER,
+            processed_rows INTEGER NOT NULL DEFAULT 0,
+            inserted_rows INTEGER,
+            ignored_rows INTEGER,
+            ingest_id INTEGER,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            batch_id TEXT,
+            worker_pid INTEGER
+        )
+    ''')
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(ingest_jobs)')]
+    for column, column_type in (('batch_id', 'TEXT'), ('worker_pid', 'INTEGER')):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE ingest_jobs ADD COLUMN {column} {column_type}')
+    conn.commit()
+
+
+def _update_job(job_id, db_path=None, **values):
+    conn = connect(db_path)
+    try:
+        ensure_jobs_schema(conn)
+        with conn:
+            conn.execute(
+                f"UPDATE ingest_jobs SET {', '.join(f'{column} = ?' for column in values)} WHERE job_id = ?",
+                (*values.values(), job_id)
+            )
+    finally:
+        conn.close()
+
+
+# 작업 하나 (dict) 또는 None
+def get_job(job_id, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_jobs_schema(conn)
+        conn.row_factory = lambda cursor, row: dict(zip([col[0] for col in cursor.description], row))
+        return conn.execute('SELECT * FROM ingest_jobs WHERE job_id = ?', (job_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+# 작업 목록 (최근 순, active_only면 대기/진행 중인 작업만)
+def list_jobs(limit=20, active_only=False, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_jobs_schema(conn)
+        where = f"WHERE status IN {ACTIVE_STATUSES}" if active_only else ''
+        return pd.read_sql_query(f'SELECT * FROM ingest_jobs {where} ORDER BY job_id DESC LIMIT ?', conn, params=(limit,))
+    finally:
+        conn.close()
+
+
+# 진행 중인 행 수를 반영한 작업 목록 (화면 표시용 열 이름)
+def job_table(limit=20, db_path=None, worker=None):
+    df = list_jobs(limit, db_path=db_path)
+    if worker is not None:
+        for job_id, processed in worker.progress().items():
+            df.loc[df['job_id'] == job_id, 'processed_rows'] = processed
+    df['status'] = df['status'].map(STATUS_LABELS).fillna(df['status'])
+    df = df.astype({column: 'Int64' for column in ('total_rows', 'processed_rows', 'inserted_rows', 'ignored_rows', 'ingest_id')})
+    return df.rename(columns={
+        'job_id': '작업번호', 'file_name': '파일명', 'status': '상태', 'total_rows': '전체행수',
+        'processed_rows': '처리행수', 'inserted_rows': '신규건수', 'ignored_rows': '중복건수',
+        'ingest_id': '적재번호', 'error': '오류', 'created_at': '등록일시', 'finished_at': '종료일시',
+    })[['작업번호', '파일명', '상태', '전체행수', '처리행수', '신규건수', '중복건수', '적재번호', '오류', '등록일시', '종료일시']]
+
+
+# 업로드 파일을 저장하고 적재 작업 등록, 작업번호 반환 (같은 파일이 대기/진행 중이면 그 작업번호)
+# (batch_id가 같은 작업은 함께 병렬로 읽어 배치 전체의 일련번호 중복을 제거한 뒤 적재)
+def submit_ingest_job(data, file_name, streaming=False, digest=None, batch_id=None, db_path=None, job_dir=None):
+    digest = digest or file_hash(data)
+    conn = connect(db_path)
+    try:
+        ensure_jobs_schema(conn)
+        row = conn.execute(
+            f'SELECT job_id FROM ingest_jobs WHERE file_hash = ? AND status IN {ACTIVE_STATUSES} ORDER BY job_id LIMIT 1',
+            (digest,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        job_dir = job_dir or JOB_DIR
+        os.makedirs(job_dir, exist_ok=True)
+        path = os.path.join(job_dir, f'{digest}.xlsx')
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        with conn:
+            job_id = conn.execute(
+                'INSERT INTO ingest_jobs (file_hash, file_name, file_path, streaming, created_at, batch_id) VALUES (?, ?, ?, ?, ?, ?)',
+                (digest, file_name, path, int(streaming), _now(), batch_id)
+            ).lastrowid
+    finally:
+        conn.close()
+    return job_id
+
+
+# 실패한 작업 다시 대기열에 넣기 (업로드 파일이 남아 있는 경우만)
+def retry_job(job_id, db_path=None):
+    job = get_job(job_id, db_path)
+    if job is None or job['status'] != 'failed' or not os.path.exists(job['file_path']):
+        return False
+    _update_job(job_id, db_path, status='queued', processed_rows=0, error=None, started_at=None, finished_at=None)
+    return True
+
+
+# 다음 대기 작업(배치면 같은 배치의 대기 작업 전체)을 진행 중으로 바꾸고 반환 (없으면 빈 목록)
+# (SQLite 3.35 미만은 RETURNING이 없으므로 쓰기 잠금을 잡은 트랜잭션 안에서 SELECT 후 UPDATE)
+def _claim_next(db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_jobs_schema(conn)
+        conn.row_factory = lambda cursor, row: dict(zip([col[0] for col in cursor.description], row))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT job_id, batch_id FROM ingest_jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1").fetchone()
+            if row is None:
+                conn.rollback()
+                return []
+            if row['batch_id'] is None:
+                where, params = 'job_id = ?', (row['job_id'],)
+            else:
+                where, params = "batch_id = ? AND status = 'queued'", (row['batch_id'],)
+            job_ids = [job['job_id'] for job in conn.execute(f'SELECT job_id FROM ingest_jobs WHERE {where}', params).fetchall()]
+            placeholders = ', '.join('?' * len(job_ids))
+            conn.execute(f"UPDATE ingest_jobs SET status = 'running', started_at = ?, worker_pid = ? WHERE job_id IN ({placeholders})",
+                         (_now(), os.getpid(), *job_ids))
+            jobs = conn.execute(f'SELECT * FROM ingest_jobs WHERE job_id IN ({placeholders}) ORDER BY job_id', job_ids).fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+    return jobs
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# 적재 작업을 한 번에 하나씩 처리하는 스레드 (적재는 작업마다 하나의 트랜잭션)
+class IngestWorker:
+    def __init__(self, db_path=None, poll_interval=5.0):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._progress = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # 서버가 중단되어 진행 중으로 남은 작업은 커밋되지 않았으므로 다시 대기열로
+    # (같은 프로세스나 살아 있는 다른 서버 프로세스가 처리 중인 작업은 그대로 둠)
+    def _recover(self):
+        conn = connect(self.db_path)
+        try:
+            ensure_jobs_schema(conn)
+            running = conn.execute("SELECT job_id, worker_pid FROM ingest_jobs WHERE status = 'running'").fetchall()
+            orphaned = [(job_id,) for job_id, pid in running if pid is None or (pid != os.getpid() and not _process_alive(pid))]
+            with conn:
+                conn.executemany("UPDATE ingest_jobs SET status = 'queued', processed_rows = 0, started_at = NULL, worker_pid = NULL WHERE job_id = ?", orphaned)
+        finally:
+            conn.close()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._recover()
+                self._thread = threading.Thread(target=self._run, name='mts-ingest-worker', daemon=True)
+                self._thread.start()
+
+    # 새 작업을 등록한 뒤 호출 (대기 중인 스레드를 바로 깨움)
+    def notify(self):
+        self.start()
+        self._wake.set()
+
+    # 진행 중인 작업의 처리 행 수 {작업번호: 행 수}
+    def progress(self):
+        with self._lock:
+            return dict(self._progress)
+
+    def _track(self, job_id, batches):
+        processed = 0
+        for batch in batches:
+            yield batch
+            processed += len(batch)
+            with self._lock:
+                self._progress[job_id] = processed
+
+    def _ingest(self, job):
+        job_id = job['job_id']
+        if job['streaming']:
+            _update_job(job_id, self.db_path, total_rows=count_excel_rows(job['file_path']))
+            batches = iter_excel_batches(job['file_path'])
+        else:
+            df = pd.read_excel(job['file_path'])
+            validate_header(list(df.columns))
+            _update_job(job_id, self.db_path, total_rows=len(df))
+            batches = iter_record_batches(df)
+        report = ingest_batches(job['file_hash'], job['file_name'], self._track(job_id, batches), db_path=self.db_path)
+        _update_job(job_id, self.db_path, status='done', total_rows=report['total'], processed_rows=report['total'],
+                    inserted_rows=report['inserted'], ignored_rows=report['ignored'], ingest_id=report['ingest_id'],
+                    finished_at=_now())
+
+    # 작업 하나 처리 (실패하면 오류를 기록하고 업로드 파일은 다시 시도할 수 있도록 남겨 둠)
+    def run_job(self, job):
+        job_id = job['job_id']
+        with self._lock:
+            self._progress[job_id] = 0
+        try:
+            previous = find_ingest(job['file_hash'], self.db_path)
+            if previous is None:
+                self._ingest(job)
+            else:
+                _update_job(job_id, self.db_path, status='done', total_rows=previous['row_count'], processed_rows=previous['row_count'],
+                            inserted_rows=0, ignored_rows=previous['row_count'], ingest_id=previous['ingest_id'],
+                            error='이미 적재된 파일입니다.', finished_at=_now())
+            if os.path.exists(job['file_path']):
+                os.remove(job['file_path'])
+        except Exception as e:
+            _update_job(job_id, self.db_path, status='failed', error=f"{type(e).__name__}: {e}", finished_at=_now())
+        finally:
+            with self._lock:
+                self._progress.pop(job_id, None)
+
+    # 같은 배치의 작업들을 병렬로 읽어 한 번에 적재
+    def run_batch(self, jobs):
+        from mts_core.batch_ingest import ingest_workbooks
+
+        with self._lock:
+            self._progress.update({job['job_id']: 0 for job in jobs})
+
+        def on_result(index, report):
+            job = jobs[index]
+            if report['error'] is not None:
+                _update_job(job['job_id'], self.db_path, status='failed', error=report['error'], finished_at=_now())
+            else:
+                _update_job(job['job_id'], self.db_path, status='done', total_rows=report['rows'], processed_rows=report['rows'] or 0,
+                            inserted_rows=report['inserted'] or 0, ignored_rows=(report['ignored'] or 0) + (report['batch_duplicates'] or 0),
+                            ingest_id=report['ingest_id'], error=report['note'], finished_at=_now())
+                if os.path.exists(job['file_path']):
+                    os.remove(job['file_path'])
+            with self._lock:
+                self._progress.pop(job['job_id'], None)
+
+        try:
+            ingest_workbooks([job['file_path'] for job in jobs], names=[job['file_name'] for job in jobs],
+                             db_path=self.db_path, on_result=on_result)
+        except Exception as e:
+            for job in jobs:
+                if job['job_id'] in self.progress():
+                    _update_job(job['job_id'], self.db_path, status='failed', error=f"{type(e).__name__}: {e}", finished_at=_now())
+        finally:
+            with self._lock:
+                for job in jobs:
+                    self._progress.pop(job['job_id'], None)
+
+    # 한 번의 처리에서 예외가 나도 스레드는 계속 대기열을 확인 (가져온 작업은 실패로 기록)
+    def _run(self):
+        while True:
+            self._wake.clear()
+            jobs = []
+            try:
+                jobs = _claim_next(self.db_path)
+                if not jobs:
+                    self._wake.wait(self.poll_interval)
+                elif jobs[0]['batch_id'] is None:
+                    self.run_job(jobs[0])
+                else:
+                    self.run_batch(jobs)
+            except Exception as e:
+                traceback.print_exc()
+                for job in jobs:
+                    try:
+                        _update_job(job['job_id'], self.db_path, status='failed', error=f"{type(e).__name__}: {e}", finished_at=_now())
+                    except Exception:
+                        traceback.print_exc()
+                with self._lock:
+                    for job in jobs:
+                        self._progress.pop(job['job_id'], None)
+                self._wake.wait(self.poll_interval)
+
+
+_default_worker = None
+_default_worker_lock = threading.Lock()
+
+
+def get_default_worker():
+    global _default_worker
+    with _default_worker_lock:
+        if _default_worker is None:
+            _default_worker = IngestWorker()
+        _default_worker.start()
+        return _default_worker
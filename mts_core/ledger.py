@@ -0,0 +1,151 @@
+import datetime
+import hashlib
+
+import pandas as pd
+
+from mts_core.anomaly import refresh_all
+from mts_core.archive import mirror_new_rows, remove_ingest, reset_archive
+from mts_core.instrument import timed
+from mts_core.rollup import reset_rollup, subtract_ingest
+from mts_core.storage import apply_bulk_pragmas, bump_data_version, connect, migrate_database, write_batches
+
+# 위반일시 열 위치 (REQUIRED_COLUMNS 기준)
+_DATETIME_INDEX = 2
+
+
+# 적재 이력 테이블 생성 및 violations 테이블 업그레이드 (ingest_id 열 등)
+def ensure_ledger_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_log (
+            ingest_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_hash TEXT UNIQUE NOT NULL,
+            file_name TEXT,
+            row_count INTEGER,
+            inserted_count INTEGER,
+            min_date TEXT,
+            max_date TEXT,
+            ingested_at TEXT
+        )
+    ''')
+    migrate_database(conn)
+
+
+# 업로드 파일 내용의 해시값 (적재 이력의 키)
+def file_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# 같은 내용의 파일이 이미 적재되었는지 확인
+def find_ingest(digest, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_ledger_schema(conn)
+        row = conn.execute('''
+            SELECT ingest_id, file_name, row_count, inserted_count, min_date, max_date, ingested_at
+            FROM ingest_log WHERE file_hash = ?
+        ''', (digest,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    keys = ['ingest_id', 'file_name', 'row_count', 'inserted_count', 'min_date', 'max_date', 'ingested_at']
+    return dict(zip(keys, row))
+
+
+# 레코드를 흘려보내며 위반일시의 최소/최대값 기록
+class _DateSpan:
+    def __init__(self):
+        self.min_date = None
+        self.max_date = None
+
+    def track(self, batches):
+        for batch in batches:
+            for record in batch:
+                value = record[_DATETIME_INDEX]
+                if not isinstance(value, str):
+                    continue
+                if self.min_date is None or value < self.min_date:
+                    self.min_date = value
+                if self.max_date is None or value > self.max_date:
+                    self.max_date = value
+            yield batch
+
+
+# 레코드 묶음을 적재하고 적재 이력에 기록 (하나의 트랜잭션)
+@timed('DB 적재')
+def ingest_batches(digest, file_name, batches, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_ledger_schema(conn)
+        apply_bulk_pragmas(conn)
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO ingest_log (file_hash, file_name, ingested_at) VALUES (?, ?, ?)',
+                (digest, file_name, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            ingest_id = cursor.lastrowid
+            span = _DateSpan()
+            report = write_batches(conn, span.track(batches), ingest_id=ingest_id)
+            conn.execute('''
+                UPDATE ingest_log SET row_count = ?, inserted_count = ?, min_date = ?, max_date = ?
+                WHERE ingest_id = ?
+            ''', (report['total'], report['inserted'], span.min_date, span.max_date, ingest_id))
+        if report['inserted']:
+            mirror_new_rows(conn, report['after_rowid'], ingest_id=ingest_id)
+    finally:
+        conn.close()
+    report['ingest_id'] = ingest_id
+    return report
+
+
+# 적재 이력 목록 (최근 순)
+def list_ingests(db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_ledger_schema(conn)
+        return pd.read_sql('''
+            SELECT ingest_id AS 적재번호, file_name AS 파일명, row_count AS 전체건수, inserted_count AS 신규건수,
+                   min_date AS 시작일시, max_date AS 종료일시, ingested_at AS 적재일시
+            FROM ingest_log ORDER BY ingest_id DESC
+        ''', conn)
+    finally:
+        conn.close()
+
+
+# 특정 적재분 되돌리기 (해당 적재로 새로 들어간 행 삭제)
+# 행은 처음 저장한 적재에만 연결되므로, 이후 적재 파일에 같은 일련번호가 있었더라도 함께 삭제됨 (의도된 동작)
+def rollback_ingest(ingest_id, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_ledger_schema(conn)
+        with conn:
+            subtract_ingest(conn, ingest_id)
+            deleted = conn.execute('DELETE FROM violations WHERE ingest_id = ?', (ingest_id,)).rowcount
+            conn.execute('DELETE FROM ingest_log WHERE ingest_id = ?', (ingest_id,))
+            refresh_all(conn)
+            bump_data_version(conn)
+        remove_ingest(conn, ingest_id)
+    finally:
+        conn.close()
+    return deleted
+
+
+# 전체 DB 삭제 시 적재 이력과 일자별 집계도 함께 비움
+def reset_ledger(conn):
+    ensure_ledger_schema(conn)
+    conn.execute('DELETE FROM ingest_log')
+    reset_rollup(conn)
+    refresh_all(conn)
+    bump_data_version(conn)
+    reset_archive(conn)
+
+
+# 전체 단속 데이터와 적재 이력 삭제
+def delete_all(db_path=None):
+    conn = connect(db_path)
+    try:
+        conn.execute('DELETE FROM violations')
+        reset_ledger(conn)
+        conn.commit()
+    finally:
+        conn.close()
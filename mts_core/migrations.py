@@ -0,0 +1,148 @@
+import argparse
+import threading
+
+from mts_core.anomaly import refresh_all
+from mts_core.rollup import ensure_rollup_schema, rebuild_rollup
+from mts_core.storage import (DB_PATH, EQUIPMENT_CODE_COLUMN_SQL, REQUIRED_COLUMNS, VIOLATION_INDEXES,
+                              VIOLATIONS_TABLE_SQL, bump_data_version, connect)
+
+# violations 재생성 시 한 번에 옮길 행 수 (rowid 구간 단위, 구간마다 커밋)
+DEFAULT_CHUNK_SIZE = 50000
+
+_REBUILD_TABLE = 'violations_rebuild'
+
+_migrate_lock = threading.Lock()
+
+
+def _has_serial_key(conn):
+    return any(row[1] == '일련번호' and row[5] for row in conn.execute('PRAGMA table_info(violations)'))
+
+
+# 1: 일련번호 기본 키가 없는 예전 violations 테이블을 키가 있는 테이블로 다시 만들고 중복 행 제거
+def rebuild_violations_with_key(conn, report, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    if _has_serial_key(conn):
+        return
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(violations)')}
+    columns = ', '.join(col for col in REQUIRED_COLUMNS + ['ingest_id'] if col in existing)
+
+    # 중간에 멈춘 이전 시도가 남긴 테이블은 버리고 처음부터
+    conn.execute(f'DROP TABLE IF EXISTS {_REBUILD_TABLE}')
+    conn.execute(VIOLATIONS_TABLE_SQL.format(table=_REBUILD_TABLE, equipment_code=EQUIPMENT_CODE_COLUMN_SQL))
+    conn.commit()
+
+    # rowid 구간 단위로 복사 (같은 일련번호는 먼저 적재된 행만 남음)
+    rows_before, first, last = conn.execute('SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM violations').fetchone()
+    copied = 0
+    if rows_before:
+        for start in range(first, last + 1, chunk_size):
+            with conn:
+                conn.execute(
+                    f'INSERT OR IGNORE INTO {_REBUILD_TABLE} ({columns}) '
+                    f'SELECT {columns} FROM violations WHERE rowid >= ? AND rowid < ? ORDER BY rowid',
+                    (start, start + chunk_size)
+                )
+            copied = min(start + chunk_size, last + 1) - first
+            if on_progress is not None:
+                on_progress(copied, last - first + 1)
+    rows_after = conn.execute(f'SELECT COUNT(*) FROM {_REBUILD_TABLE}').fetchone()[0]
+
+    # 테이블 교체와 인덱스/집계/장비 통계 재생성은 한 트랜잭션으로 (DDL은 자동 트랜잭션이 아니므로 직접 시작)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DROP TABLE violations')
+        conn.execute(f'ALTER TABLE {_REBUILD_TABLE} RENAME TO violations')
+        for name, index_columns in VIOLATION_INDEXES.items():
+            conn.execute(f'CREATE INDEX {name} ON violations {index_columns}')
+        ensure_rollup_schema(conn)
+        rebuild_rollup(conn)
+        refresh_all(conn)
+        bump_data_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    report.update(rebuilt=True, rows_before=rows_before, rows_after=rows_after,
+                  duplicates_removed=rows_before - rows_after)
+
+
+# 2: 기능별로 처음 쓸 때 만들던 보조 테이블을 한 번에 생성
+def create_support_tables(conn, report, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    from mts_core.anomaly import ensure_anomaly_schema
+    from mts_core.camera_cache import ensure_camera_cache_schema
+    from mts_core.jobs import ensure_jobs_schema
+    from mts_core.ledger import ensure_ledger_schema
+    from mts_core.normalize import ensure_normalization_schema
+    from mts_core.workbooks import ensure_snapshot_schema
+
+    for ensure in (ensure_ledger_schema, ensure_anomaly_schema, ensure_camera_cache_schema,
+                   ensure_normalization_schema, ensure_snapshot_schema, ensure_jobs_schema):
+        ensure(conn)
+    conn.commit()
+
+
+# (버전, 설명, 함수) 순서대로 한 번씩 적용, 마지막으로 적용한 버전은 PRAGMA user_version에 기록
+MIGRATIONS = [
+    (1, '일련번호 기본 키로 violations 재생성', rebuild_violations_with_key),
+    (2, '보조 테이블 생성', create_support_tables),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# 적용하지 않은 마이그레이션 실행, 테이블을 다시 만들었으면 VACUUM/ANALYZE
+# on_progress(복사한 rowid 범위, 전체 rowid 범위)는 violations 재생성 중 구간마다 호출
+def migrate(db_path=None, chunk_size=DEFAULT_CHUNK_SIZE, vacuum=True, on_progress=None):
+    with _migrate_lock:
+        conn = connect(db_path)
+        try:
+            conn.execute(VIOLATIONS_TABLE_SQL.format(table='violations', equipment_code=EQUIPMENT_CODE_COLUMN_SQL))
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            report = {'from_version': version, 'to_version': version, 'applied': [], 'rebuilt': False,
+                      'rows_before': None, 'rows_after': None, 'duplicates_removed': 0, 'vacuumed': False}
+            for number, description, step in MIGRATIONS:
+                if number <= version:
+                    continue
+                step(conn, report, chunk_size=chunk_size, on_progress=on_progress)
+                conn.execute(f'PRAGMA user_version = {number}')
+                conn.commit()
+                report['applied'].append(description)
+                report['to_version'] = number
+            if report['rebuilt'] and vacuum:
+                conn.execute('VACUUM')
+                conn.execute('ANALYZE')
+                report['vacuumed'] = True
+        finally:
+            conn.close()
+
+    if report['rebuilt']:
+        from mts_core.archive import archive_available, rebuild_archive
+
+        if archive_available():
+            rebuild_archive(db_path)
+    return report
+
+
+# 예전 DB 업그레이드/정리: python -m mts_core migrate [--db 경로] [--chunk-size N] [--no-vacuum]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='데이터베이스 스키마를 최신 버전으로 올리고 중복 행을 정리합니다.')
+    parser.add_argument('--db', default=DB_PATH, help='데이터베이스 파일 경로')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='violations 재생성 시 한 번에 옮길 행 수')
+    parser.add_argument('--no-vacuum', action='store_true', help='재생성 후 VACUUM/ANALYZE 생략')
+    args = parser.parse_args(argv)
+
+    def on_progress(copied, total):
+        print(f"violations 복사 {copied}/{total} ({copied / total:.0%})")
+
+    report = migrate(args.db, chunk_size=args.chunk_size, vacuum=not args.no_vacuum, on_progress=on_progress)
+    if not report['applied']:
+        print(f"이미 최신 스키마입니다 (버전 {report['to_version']})")
+        return
+    print(f"스키마 버전 {report['from_version']} -> {report['to_version']}: {', '.join(report['applied'])}")
+    if report['rebuilt']:
+        print(f"violations {report['rows_before']}행 -> {report['rows_after']}행 (중복 {report['duplicates_removed']}건 제거)")
+    if report['vacuumed']:
+        print("VACUUM/ANALYZE 완료")
+
+
+if __name__ == '__main__':
+    main()
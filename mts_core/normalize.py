@@ -0,0 +1,224 @@
+import datetime
+import difflib
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+import pandas as pd
+
+from mts_core.compare import VALUE_MAPPINGS, normalize_values
+from mts_core.storage import connect
+
+# 표기 차이를 자동으로 통일할 열과 최소 유사도
+# (설치지점은 '중앙로 96'과 '중앙로 96 앞', 관할경찰서는 '창원서부'와 '창원중부'처럼
+#  실제로 다른 값도 유사도가 높으므로 표기 정리 후 정확히 같은 값만 같은 것으로 봄)
+FUZZY_COLUMNS = {'설치업체': 0.8}
+
+# 표기 정리(전각 문자, 회사 형태, 공백)만 하는 열 포함
+CANONICAL_COLUMNS = ['설치업체', '설치지점', '관할경찰서']
+
+# 최고 후보와 차순위 후보의 유사도 차이가 이보다 작으면 애매하므로 통일하지 않음
+AMBIGUITY_MARGIN = 0.02
+
+# 블록 안에서 이 비율 이상의 값에 나오는 2글자 조각은 후보 검색에 쓰지 않음
+COMMON_GRAM_RATIO = 0.5
+
+# 회사 형태 표기 ((주), 주식회사 등)
+CORPORATE_PATTERN = re.compile(r'\((주|유|합|사|재)\)|주식회사|유한회사|유한책임회사|합자회사')
+DIGIT_PATTERN = re.compile(r'\d+')
+
+
+# 문자열 표기 정리: 전각/호환 문자 통일(NFKC), 회사 형태 제거, 공백 정리
+def canonical_text(value):
+    if not isinstance(value, str):
+        return value
+    text = unicodedata.normalize('NFKC', value)
+    text = CORPORATE_PATTERN.sub('', text)
+    return ' '.join(text.split())
+
+
+# 열 전체 표기 정리 (고유값만 계산 후 매핑)
+def canonicalize_series(series):
+    uniques = series.dropna().unique()
+    return series.map({value: canonical_text(value) for value in uniques}).where(series.notna(), series)
+
+
+# 값 매핑표의 유사 표기 열도 같은 방식으로 정리
+def canonical_mappings(value_mappings, columns):
+    mappings = {}
+    for column, mapping in value_mappings.items():
+        if column in columns:
+            mapping = {canonical_text(source): canonical_text(target) for source, target in mapping.items()}
+        mappings[column] = mapping
+    return mappings
+
+
+def _compact(text):
+    return ''.join(text.split())
+
+
+def _grams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+# 기준 값 목록에 대한 2글자 조각 색인 (같은 숫자를 가진 값끼리만 비교)
+class GramMatcher:
+    def __init__(self, reference, min_ratio):
+        self.min_ratio = min_ratio
+        self._exact = {}
+        self._values = []
+        self._postings = {}
+        for value in reference:
+            compact = _compact(value)
+            self._exact.setdefault(compact, value)
+            index = len(self._values)
+            self._values.append((value, compact, DIGIT_PATTERN.findall(compact)))
+            for gram in _grams(compact):
+                self._postings.setdefault(gram, []).append(index)
+
+    # (통일할 값, 유사도) 또는 None
+    def match(self, value, max_candidates=20):
+        compact = _compact(value)
+        if compact in self._exact:
+            return self._exact[compact], 1.0
+        common_limit = max(COMMON_GRAM_RATIO * len(self._values), 20)
+        shared = Counter()
+        for gram in _grams(compact):
+            postings = self._postings.get(gram, ())
+            if len(postings) <= common_limit:
+                shared.update(postings)
+        digits = DIGIT_PATTERN.findall(compact)
+        scores = []
+        for index, _ in shared.most_common(max_candidates):
+            candidate, candidate_compact, candidate_digits = self._values[index]
+            if candidate_digits != digits:
+                continue  # 숫자가 다르면 다른 값
+            matcher = difflib.SequenceMatcher(None, compact, candidate_compact)
+            if matcher.real_quick_ratio() < self.min_ratio or matcher.quick_ratio() < self.min_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= self.min_ratio:
+                scores.append((ratio, candidate))
+        if not scores:
+            return None
+        scores.sort(reverse=True)
+        if len(scores) > 1 and scores[0][1] != scores[1][1] and scores[0][0] - scores[1][0] < AMBIGUITY_MARGIN:
+            return None
+        return scores[0][1], scores[0][0]
+
+
+def ensure_normalization_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS normalization_map (
+            column_name TEXT NOT NULL,
+            source_value TEXT NOT NULL,
+            target_value TEXT NOT NULL,
+            score REAL,
+            learned_at TEXT NOT NULL,
+            PRIMARY KEY (column_name, source_value)
+        )
+    ''')
+    conn.commit()
+
+
+# 유사 표기 통일 (학습한 매핑은 DB에 저장해 다음 실행에서 재사용)
+class ValueNormalizer:
+    def __init__(self, db_path=None, columns=None):
+        self.db_path = db_path
+        self.columns = dict(FUZZY_COLUMNS if columns is None else columns)
+        self._learned = None
+        self._misses = {}  # 열 -> (기준 값 목록 지문, 통일할 값을 찾지 못한 값)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._learned is None:
+            conn = connect(self.db_path)
+            try:
+                ensure_normalization_schema(conn)
+                rows = conn.execute('SELECT column_name, source_value, target_value FROM normalization_map').fetchall()
+            finally:
+                conn.close()
+            self._learned = {}
+            for column, source, target in rows:
+                self._learned.setdefault(column, {})[source] = target
+        return self._learned
+
+    def _save(self, column, matches):
+        learned_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn = connect(self.db_path)
+        try:
+            ensure_normalization_schema(conn)
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO normalization_map (column_name, source_value, target_value, score, learned_at) VALUES (?, ?, ?, ?, ?)',
+                    [(column, source, target, score, learned_at) for source, (target, score) in matches.items()]
+                )
+        finally:
+            conn.close()
+
+    # 학습된 매핑 목록 (통일 대상 열만, 예전에 학습했더라도 대상에서 뺀 열은 적용하지 않으므로 제외)
+    def learned_mappings(self):
+        with self._lock:
+            learned = self._load()
+            rows = [(column, source, target) for column, mapping in learned.items() if column in self.columns
+                    for source, target in mapping.items()]
+        return pd.DataFrame(rows, columns=['열', '원래 값', '통일 값'])
+
+    # 값 매핑 + 유사 표기 통일: 표기 정리 -> 값 매핑표 -> 학습된 매핑(양쪽) -> TEMS에만 있는 값을 TCS 표기와 유사도 비교
+    def align(self, df_tcs, df_tems, value_mappings=None):
+        value_mappings = VALUE_MAPPINGS if value_mappings is None else value_mappings
+        df_tcs = df_tcs.copy()
+        df_tems = df_tems.copy()
+        canonical_columns = [column for column in dict.fromkeys(CANONICAL_COLUMNS + list(self.columns))
+                             if column in df_tcs.columns and column in df_tems.columns]
+        for column in canonical_columns:
+            df_tcs[column] = canonicalize_series(df_tcs[column])
+            df_tems[column] = canonicalize_series(df_tems[column])
+        mappings = canonical_mappings(value_mappings, canonical_columns)
+        df_tcs = normalize_values(df_tcs, mappings)
+        df_tems = normalize_values(df_tems, mappings)
+        columns = [column for column in self.columns if column in canonical_columns]
+
+        with self._lock:
+            learned = self._load()
+            for column in columns:
+                mapping = learned.setdefault(column, {})
+                if mapping:
+                    df_tcs[column] = df_tcs[column].map(mapping).fillna(df_tcs[column])
+                    df_tems[column] = df_tems[column].map(mapping).fillna(df_tems[column])
+                reference = [value for value in df_tcs[column].dropna().unique() if isinstance(value, str)]
+                reference_set = frozenset(reference)
+                fingerprint, misses = self._misses.get(column, (None, set()))
+                if fingerprint != hash(reference_set):
+                    misses = set()
+                    self._misses[column] = (hash(reference_set), misses)
+                pending = [value for value in df_tems[column].dropna().unique()
+                           if isinstance(value, str) and value not in reference_set and value not in misses]
+                if not pending:
+                    continue
+                matcher = GramMatcher(reference, self.columns[column])
+                matches = {}
+                for value in pending:
+                    found = matcher.match(value)
+                    if found is not None:
+                        matches[value] = found
+                    else:
+                        misses.add(value)
+                if matches:
+                    mapping.update({source: target for source, (target, _) in matches.items()})
+                    self._save(column, matches)
+                    df_tems[column] = df_tems[column].map(mapping).fillna(df_tems[column])
+        return df_tcs, df_tems
+
+
+_default_normalizer = None
+_default_normalizer_lock = threading.Lock()
+
+
+def get_default_normalizer():
+    global _default_normalizer
+    with _default_normalizer_lock:
+        if _default_normalizer is None:
+            _default_normalizer = ValueNormalizer()
+        return _default_normalizer
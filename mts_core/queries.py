@@ -0,0 +1,167 @@
+import argparse
+import datetime
+
+import pandas as pd
+
+from mts_core.archive import archive_is_current, load_archive
+from mts_core.cache import cached_query
+from mts_core.frames import compact_frame
+from mts_core.instrument import timed
+from mts_core.storage import DB_PATH, REQUIRED_COLUMNS, connect
+
+# 선택 상자의 '전체' 옵션 (필터 미적용)
+ALL_OPTION = '전체'
+
+# 사이드바 필터로 사용하는 열
+FILTER_COLUMNS = ['위반유형', '처리상태', '장소구분']
+
+# 조회 가능한 열 (열 이름은 SQL에 직접 들어가므로 목록으로 제한)
+QUERY_COLUMNS = REQUIRED_COLUMNS + ['장비코드']
+
+
+def _check_columns(columns):
+    unknown = [col for col in columns if col not in QUERY_COLUMNS]
+    if unknown:
+        raise ValueError(f"조회할 수 없는 열입니다: {', '.join(unknown)}")
+
+
+# 날짜 범위와 사이드바 필터를 파라미터 WHERE 절로 변환
+def build_where(start_date=None, end_date=None, filters=None, equipment_code=None):
+    clauses = []
+    params = []
+    if start_date is not None:
+        clauses.append('위반일시 >= ?')
+        params.append(start_date.isoformat())
+    if end_date is not None:
+        clauses.append('위반일시 < ?')  # 종료일 당일 포함
+        params.append((end_date + datetime.timedelta(days=1)).isoformat())
+    for col, value in (filters or {}).items():
+        if value is None or value == ALL_OPTION:
+            continue
+        _check_columns([col])
+        clauses.append(f'{col} = ?')
+        params.append(value)
+    if equipment_code:
+        clauses.append('장비코드 = ?')
+        params.append(equipment_code)
+    if not clauses:
+        return '', params
+    return ' WHERE ' + ' AND '.join(clauses), params
+
+
+# 전체 데이터의 최소/최대 위반일자 (데이터가 없으면 None, None)
+@cached_query
+def get_date_bounds(db_path=None):
+    conn = connect(db_path)
+    try:
+        min_value, max_value = conn.execute(
+            'SELECT (SELECT min(위반일시) FROM violations), (SELECT max(위반일시) FROM violations)'
+        ).fetchone()
+    finally:
+        conn.close()
+    if min_value is None:
+        return None, None
+    return pd.Timestamp(min_value).date(), pd.Timestamp(max_value).date()
+
+
+# 기간 내 선택 상자 옵션 목록
+@timed('필터 옵션 조회')
+@cached_query
+def get_distinct_options(column, start_date=None, end_date=None, db_path=None):
+    _check_columns([column])
+    where, params = build_where(start_date, end_date)
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(f'SELECT DISTINCT {column} FROM violations{where} ORDER BY {column}', params).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows if row[0] is not None]
+
+
+# 조건에 맞는 행과 열만 조회 (compact_frame 형식, Parquet 보관소가 최신이면 보관소에서 읽음)
+@timed('단속 데이터 조회')
+@cached_query
+def load_violations(start_date=None, end_date=None, filters=None, columns=None, equipment_code=None, db_path=None):
+    columns = list(columns or QUERY_COLUMNS)
+    _check_columns(columns)
+    if archive_is_current(db_path):
+        return compact_frame(load_archive(start_date, end_date, filters, columns, equipment_code))
+    where, params = build_where(start_date, end_date, filters, equipment_code)
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql(f"SELECT {', '.join(columns)} FROM violations{where}", conn, params=params)
+    finally:
+        conn.close()
+    return compact_frame(df)
+
+
+# 일자별 집계 테이블에서 날짜/위반유형별 건수 조회
+@timed('일자별 집계 조회')
+def load_daily_counts(start_date=None, end_date=None, filters=None, equipment_code=None, db_path=None):
+    clauses = []
+    params = []
+    if start_date is not None:
+        clauses.append('날짜 >= ?')
+        params.append(start_date.isoformat())
+    if end_date is not None:
+        clauses.append('날짜 <= ?')
+        params.append(end_date.isoformat())
+    for col, value in (filters or {}).items():
+        if value is None or value == ALL_OPTION:
+            continue
+        if col not in FILTER_COLUMNS:
+            raise ValueError(f"필터로 사용할 수 없는 열입니다: {col}")
+        clauses.append(f'{col} = ?')
+        params.append(value)
+    if equipment_code:
+        clauses.append('장비코드 = ?')
+        params.append(equipment_code)
+    where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql(f'''
+            SELECT 날짜, 위반유형, SUM(건수) AS 건수
+            FROM daily_rollup{where}
+            GROUP BY 날짜, 위반유형
+        ''', conn, params=params)
+    finally:
+        conn.close()
+    df['날짜'] = pd.to_datetime(df['날짜']).dt.date
+    return df
+
+
+# 단속 건수 요약 표 (행: 단속 건수 + 위반유형, 열: 날짜)와 총 단속건수
+@timed('요약 표 집계')
+@cached_query
+def summary_table(start_date=None, end_date=None, filters=None, equipment_code=None, db_path=None):
+    daily = load_daily_counts(start_date, end_date, filters, equipment_code, db_path)
+    daily_counts = daily.groupby('날짜')['건수'].sum().rename('단속 건수')
+    violation_counts = daily[daily['위반유형'] != ''].pivot_table(
+        index='날짜', columns='위반유형', values='건수', aggfunc='sum', fill_value=0
+    )
+    violation_counts.columns.name = None
+    combined_df = pd.concat([daily_counts.to_frame().T, violation_counts.T], sort=False)
+    combined_df = combined_df.loc[:, (combined_df != 0).any(axis=0)]  # 모든 건수가 0인 열 제거
+    return combined_df, int(daily['건수'].sum())
+
+
+# 기간/필터별 단속 건수 요약 출력: python -m mts_core summary [--start 2024-10-01] [--end 2024-10-31] [--위반유형 신호위반] [--out 요약.csv]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='적재된 단속 데이터의 일자별/위반유형별 건수 요약을 출력합니다.')
+    parser.add_argument('--db', default=DB_PATH, help='데이터베이스 파일 경로')
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=None, help='시작일 (YYYY-MM-DD, 기본: 전체)')
+    parser.add_argument('--end', type=datetime.date.fromisoformat, default=None, help='종료일 (YYYY-MM-DD, 기본: 전체)')
+    for column in FILTER_COLUMNS:
+        parser.add_argument(f'--{column}', dest=column, default=ALL_OPTION, help=f'{column} 필터')
+    parser.add_argument('--equipment', default=None, help='장비코드')
+    parser.add_argument('--out', default=None, help='요약 표를 저장할 CSV 경로')
+    args = parser.parse_args(argv)
+
+    filters = {column: getattr(args, column) for column in FILTER_COLUMNS}
+    combined_df, total = summary_table(args.start, args.end, filters, equipment_code=args.equipment, db_path=args.db)
+    if args.out:
+        combined_df.to_csv(args.out, encoding='utf-8-sig')
+        print(f"요약 저장: {args.out}")
+    else:
+        print(combined_df.to_string())
+    print(f"총 단속건수: {total} 건")
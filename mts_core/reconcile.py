@@ -0,0 +1,146 @@
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from mts_core.compare import COMPARE_COLUMNS, compare_inventories, difference_table, equipment_summary, prepare_tcs, prepare_tems
+from mts_core.normalize import ValueNormalizer
+from mts_core.storage import DB_PATH
+
+# 파일 이름에서 TCS/TEMS 구분 (예: 경남_TCS.xlsx, 경남_TEMS.xlsx)
+SOURCE_PATTERN = re.compile(r'(TEMS|TCS)', re.IGNORECASE)
+REPORT_FORMATS = ('xlsx', 'csv')
+
+
+# 디렉터리에서 지역별 (TCS, TEMS) 파일 쌍 찾기
+def find_pairs(directory):
+    pairs = {}
+    for path in sorted(Path(directory).glob('*.xlsx')):
+        if path.name.startswith('~$'):
+            continue  # 엑셀 임시 파일
+        match = SOURCE_PATTERN.search(path.stem)
+        if match is None:
+            continue
+        region = (path.stem[:match.start()] + path.stem[match.end():]).strip(' _-') or path.stem
+        pairs.setdefault(region, {})[match.group(1).upper()] = str(path)
+    return [(region, files['TCS'], files['TEMS']) for region, files in pairs.items() if 'TCS' in files and 'TEMS' in files]
+
+
+# 목록 파일(CSV: 지역,TCS,TEMS)에서 파일 쌍 읽기 (상대 경로는 목록 파일 기준)
+def read_manifest(manifest):
+    base = Path(manifest).parent
+    df = pd.read_csv(manifest, dtype=str)
+    missing = [col for col in ('지역', 'TCS', 'TEMS') if col not in df.columns]
+    if missing:
+        raise ValueError(f"목록 파일에 필수 열이 없습니다: {', '.join(missing)}")
+    return [(row['지역'], str(base / row['TCS']), str(base / row['TEMS'])) for _, row in df.iterrows()]
+
+
+def _safe_name(region):
+    return re.sub(r'[\\/:*?"<>|]+', '_', region)
+
+
+# 종합 요약의 건수 열
+COUNT_COLUMNS = ['TCS 장비수', 'TEMS 장비수', 'TCS에만 있음', 'TEMS에만 있음', '차이 장비수'] + [f'{col} 차이' for col in COMPARE_COLUMNS]
+
+
+# 지역 하나 비교 후 보고서 저장 (프로세스 풀에서 실행), 종합 요약 한 행 반환
+# (fuzzy_db가 있으면 그 DB의 학습된 표기 통일 목록을 함께 사용/저장)
+# 손상된 엑셀, 표기 통일 DB 잠금 등 어떤 오류든 그 지역의 '오류' 열에 기록하고 나머지 지역은 계속 비교
+def reconcile_pair(region, tcs_path, tems_path, out_dir, report_format='xlsx', fuzzy_db=None):
+    row = {'지역': region, 'TCS 파일': os.path.basename(tcs_path), 'TEMS 파일': os.path.basename(tems_path)}
+    try:
+        row.update(_reconcile_pair(region, tcs_path, tems_path, out_dir, report_format, fuzzy_db))
+    except Exception as e:
+        row['오류'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _reconcile_pair(region, tcs_path, tems_path, out_dir, report_format, fuzzy_db):
+    normalizer = ValueNormalizer(fuzzy_db) if fuzzy_db else None
+    comparison = compare_inventories(prepare_tcs(pd.read_excel(tcs_path)), prepare_tems(pd.read_excel(tems_path)), normalizer=normalizer)
+
+    differences = difference_table(comparison)
+    summary = equipment_summary(comparison['tcs'], comparison['tems'])
+    tcs_codes = set(comparison['tcs']['장비코드'])
+    tems_codes = set(comparison['tems']['장비코드'])
+    field_counts = comparison['mismatch'].sum()
+    row = {
+        'TCS 장비수': len(tcs_codes),
+        'TEMS 장비수': len(tems_codes),
+        'TCS에만 있음': len(tcs_codes - tems_codes),
+        'TEMS에만 있음': len(tems_codes - tcs_codes),
+        '차이 장비수': len(differences),
+    }
+    for col in COMPARE_COLUMNS:
+        row[f'{col} 차이'] = int(field_counts.get(col, 0))
+
+    name = _safe_name(region)
+    if report_format == 'csv':
+        differences.to_csv(os.path.join(out_dir, f'{name}_차이목록.csv'), index=False, encoding='utf-8-sig')
+        summary.to_csv(os.path.join(out_dir, f'{name}_장비요약.csv'), index=False, encoding='utf-8-sig')
+    else:
+        with pd.ExcelWriter(os.path.join(out_dir, f'{name}_비교결과.xlsx')) as writer:
+            summary.to_excel(writer, sheet_name='장비요약', index=False)
+            differences.to_excel(writer, sheet_name='차이목록', index=False)
+    return row
+
+
+# 여러 지역을 병렬로 비교하고 종합 요약 저장, 종합 요약 표 반환
+def reconcile_all(pairs, out_dir, report_format='xlsx', workers=None, fuzzy_db=None):
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 보고서 형식입니다: {report_format}")
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(reconcile_pair, region, tcs_path, tems_path, out_dir, report_format, fuzzy_db): (region, tcs_path, tems_path)
+                   for region, tcs_path, tems_path in pairs}
+        for future in as_completed(futures):
+            try:
+                rows.append(future.result())
+            except Exception as e:  # 작업 프로세스가 비정상 종료한 경우 등
+                region, tcs_path, tems_path = futures[future]
+                rows.append({'지역': region, 'TCS 파일': os.path.basename(tcs_path), 'TEMS 파일': os.path.basename(tems_path),
+                             '오류': f"{type(e).__name__}: {e}"})
+    summary = pd.DataFrame(rows)
+    if not summary.empty:
+        summary = summary.sort_values('지역').reset_index(drop=True)
+    # 오류가 난 지역의 빈 건수 때문에 실수형(458.0)이 되지 않도록 nullable 정수형으로
+    count_columns = [col for col in COUNT_COLUMNS if col in summary.columns]
+    summary = summary.astype({col: 'Int64' for col in count_columns})
+    if '오류' in summary.columns:
+        summary = summary[[col for col in summary.columns if col != '오류'] + ['오류']]
+    if report_format == 'csv':
+        summary.to_csv(os.path.join(out_dir, '종합요약.csv'), index=False, encoding='utf-8-sig')
+    else:
+        summary.to_excel(os.path.join(out_dir, '종합요약.xlsx'), index=False)
+    return summary
+
+
+# 지역별 TCS/TEMS 일괄 비교: python -m mts_core.reconcile <디렉터리|목록.csv> [--out 경로] [--format xlsx|csv] [--workers N]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='지역별 TCS/TEMS 엑셀 파일 쌍을 일괄 비교해 보고서를 만듭니다.')
+    parser.add_argument('source', help='*TCS*.xlsx / *TEMS*.xlsx 파일이 있는 디렉터리 또는 지역,TCS,TEMS 열이 있는 CSV 목록 파일')
+    parser.add_argument('--out', default='reconcile_reports', help='보고서 저장 경로')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='xlsx', help='보고서 형식')
+    parser.add_argument('--workers', type=int, default=None, help='동시 처리 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--db', default=DB_PATH, help='학습된 표기 통일 목록을 저장할 데이터베이스 파일 경로')
+    parser.add_argument('--fuzzy', action='store_true', help='설치업체 유사 표기 자동 통일 사용')
+    args = parser.parse_args(argv)
+
+    pairs = find_pairs(args.source) if os.path.isdir(args.source) else read_manifest(args.source)
+    if not pairs:
+        parser.error('비교할 TCS/TEMS 파일 쌍이 없습니다.')
+    summary = reconcile_all(pairs, args.out, args.format, args.workers, args.db if args.fuzzy else None)
+    failed = summary['오류'].notna().sum() if '오류' in summary.columns else 0
+    print(f"{len(summary)}개 지역 비교 완료 (오류 {failed}개), 보고서: {args.out}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
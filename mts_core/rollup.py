@@ -0,0 +1,97 @@
+import argparse
+import sqlite3
+
+# 일자별 집계 테이블의 집계 단위
+ROLLUP_KEYS = ['날짜', '장비코드', '위반유형', '처리상태', '장소구분']
+
+# violations 행을 집계 단위로 묶는 SELECT (NULL은 ''로 저장해 PRIMARY KEY 충돌 판정이 되도록 함)
+_ROLLUP_SELECT_SQL = '''
+    SELECT date(위반일시), coalesce(장비코드, ''), coalesce(위반유형, ''), coalesce(처리상태, ''),
+           coalesce(장소구분, ''), {sign} * COUNT(*)
+    FROM violations
+    WHERE {condition}
+    GROUP BY 1, 2, 3, 4, 5
+'''
+
+_ROLLUP_UPSERT_SQL = '''
+    INSERT INTO daily_rollup (날짜, 장비코드, 위반유형, 처리상태, 장소구분, 건수)
+    {select}
+    ON CONFLICT (날짜, 장비코드, 위반유형, 처리상태, 장소구분) DO UPDATE SET 건수 = 건수 + excluded.건수
+'''
+
+
+# 일자별 집계 테이블 생성 (새로 만든 경우 기존 데이터로 채움)
+def ensure_rollup_schema(conn):
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_rollup'").fetchone()
+    if exists:
+        return
+    conn.execute('''
+        CREATE TABLE daily_rollup (
+            날짜 TEXT NOT NULL,
+            장비코드 TEXT NOT NULL,
+            위반유형 TEXT NOT NULL,
+            처리상태 TEXT NOT NULL,
+            장소구분 TEXT NOT NULL,
+            건수 INTEGER NOT NULL,
+            PRIMARY KEY (날짜, 장비코드, 위반유형, 처리상태, 장소구분)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_daily_rollup_equipment ON daily_rollup (장비코드, 날짜)')
+    rebuild_rollup(conn)
+
+
+def _apply(conn, condition, params, sign):
+    select = _ROLLUP_SELECT_SQL.format(sign=sign, condition=condition)
+    conn.execute(_ROLLUP_UPSERT_SQL.format(select=select), params)
+    if sign < 0:
+        conn.execute('DELETE FROM daily_rollup WHERE 건수 <= 0')
+
+
+# 현재 violations 최대 rowid (적재 전에 기록해 두고 신규 행만 집계에 반영)
+def max_rowid(conn):
+    return conn.execute('SELECT coalesce(max(rowid), 0) FROM violations').fetchone()[0]
+
+
+# rowid가 기준값보다 큰 신규 행을 집계에 더함 (적재 트랜잭션 안에서 호출)
+def add_rows_after(conn, rowid):
+    _apply(conn, 'rowid > ?', (rowid,), 1)
+
+
+# 특정 적재분을 삭제하기 전에 집계에서 뺌
+def subtract_ingest(conn, ingest_id):
+    _apply(conn, 'ingest_id = ?', (ingest_id,), -1)
+
+
+# 전체 DB 삭제 시 집계도 비움
+def reset_rollup(conn):
+    ensure_rollup_schema(conn)
+    conn.execute('DELETE FROM daily_rollup')
+
+
+# violations 전체로 집계를 다시 계산
+def rebuild_rollup(conn):
+    conn.execute('DELETE FROM daily_rollup')
+    _apply(conn, '1', (), 1)
+
+
+# 기존 DB의 일자별 집계 재생성: python -m mts_core.rollup [--db 경로]
+def main(argv=None):
+    from mts_core.storage import DB_PATH, create_database
+
+    parser = argparse.ArgumentParser(description='일자별 단속 건수 집계 테이블을 다시 만듭니다.')
+    parser.add_argument('--db', default=DB_PATH, help='데이터베이스 파일 경로')
+    args = parser.parse_args(argv)
+
+    create_database(args.db)
+    conn = sqlite3.connect(args.db)
+    try:
+        with conn:
+            rebuild_rollup(conn)
+        rows = conn.execute('SELECT COUNT(*), coalesce(SUM(건수), 0) FROM daily_rollup').fetchone()
+    finally:
+        conn.close()
+    print(f"집계 {rows[0]}행 생성 (원본 {rows[1]}건)")
+
+
+if __name__ == '__main__':
+    main()
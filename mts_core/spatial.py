@@ -0,0 +1,132 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from mts_core.cache import ResultCache
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+# 격자 한 칸 크기 (위경도 0.01도 ≒ 1km)
+DEFAULT_CELL_SIZE = 0.01
+
+
+# 위경도 배열 사이 거리(m) (하버사인)
+def haversine_m(lat, lon, lats, lons):
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+# 카메라 좌표 격자 색인 (영역/반경/최근접 조회, 결과는 원본 행 위치)
+class CameraSpatialIndex:
+    def __init__(self, lats, lons, cell_size=DEFAULT_CELL_SIZE):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        self.positions = np.flatnonzero(valid)
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.cell_size = cell_size
+        if len(self.positions) == 0:
+            self._keys = np.empty(0, dtype=np.int64)
+            self._order = np.empty(0, dtype=np.int64)
+            return
+        rows = np.floor(self.lats / cell_size).astype(np.int64)
+        cols = np.floor(self.lons / cell_size).astype(np.int64)
+        self._row_min, self._row_max = rows.min(), rows.max()
+        self._col_min, self._col_max = cols.min(), cols.max()
+        self._ncols = self._col_max - self._col_min + 1
+        keys = (rows - self._row_min) * self._ncols + (cols - self._col_min)
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    # 격자 칸 후보 (내부 배열 위치)
+    def _candidates(self, south, west, north, east):
+        if len(self._keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        row_lo = max(int(np.floor(south / self.cell_size)), self._row_min)
+        row_hi = min(int(np.floor(north / self.cell_size)), self._row_max)
+        col_lo = max(int(np.floor(west / self.cell_size)), self._col_min)
+        col_hi = min(int(np.floor(east / self.cell_size)), self._col_max)
+        if row_lo > row_hi or col_lo > col_hi:
+            return np.empty(0, dtype=np.int64)
+        if (row_hi - row_lo + 1) > len(self._keys):
+            return np.arange(len(self.positions))  # 칸 수가 점보다 많으면 전체 비교가 더 빠름
+        # 같은 행의 연속된 열은 키가 연속이므로 행마다 한 번의 searchsorted
+        base = (np.arange(row_lo, row_hi + 1) - self._row_min) * self._ncols
+        starts = np.searchsorted(self._keys, base + (col_lo - self._col_min), side='left')
+        ends = np.searchsorted(self._keys, base + (col_hi - self._col_min), side='right')
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.int64)
+        return self._order[np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])]
+
+    # 지도 영역(남서~북동) 안의 카메라
+    def bbox(self, south, west, north, east):
+        idx = self._candidates(south, west, north, east)
+        inside = (self.lats[idx] >= south) & (self.lats[idx] <= north) & (self.lons[idx] >= west) & (self.lons[idx] <= east)
+        return self.positions[np.sort(idx[inside])]
+
+    def _radius_candidates(self, lat, lon, radius_m):
+        dlat = radius_m / METERS_PER_DEGREE
+        dlon = radius_m / (METERS_PER_DEGREE * max(np.cos(np.radians(lat)), 1e-6))
+        idx = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        return idx, haversine_m(lat, lon, self.lats[idx], self.lons[idx])
+
+    # 반경(m) 안의 카메라 (가까운 순 원본 행 위치, 거리)
+    def radius(self, lat, lon, radius_m):
+        idx, dist = self._radius_candidates(lat, lon, radius_m)
+        inside = dist <= radius_m
+        idx, dist = idx[inside], dist[inside]
+        order = np.argsort(dist, kind='stable')
+        return self.positions[idx[order]], dist[order]
+
+    # 가장 가까운 k개 카메라 (반경을 두 배씩 넓히며 검색)
+    def nearest(self, lat, lon, k):
+        k = min(k, len(self.positions))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius_m = self.cell_size * METERS_PER_DEGREE
+        span_m = max(self._row_max - self._row_min + 1, self._ncols) * self.cell_size * METERS_PER_DEGREE * 2
+        while True:
+            idx, dist = self._radius_candidates(lat, lon, radius_m)
+            if np.count_nonzero(dist <= radius_m) >= k or radius_m > span_m + abs(lat) * METERS_PER_DEGREE:
+                break
+            radius_m *= 2
+        if np.count_nonzero(dist <= radius_m) < k:
+            idx = np.arange(len(self.positions))
+            dist = haversine_m(lat, lon, self.lats, self.lons)
+        order = np.argsort(dist, kind='stable')[:k]
+        return self.positions[idx[order]], dist[order]
+
+
+# st_folium 반환값의 지도 영역 -> (남, 서, 북, 동), 영역이 없으면 None
+# (브라우저가 영역을 보내기 전에는 마커 범위가 오므로 넓이가 0인 영역은 무시)
+def viewport_bounds(map_state, digits=5):
+    bounds = (map_state or {}).get('bounds') or {}
+    south_west = bounds.get('_southWest') or {}
+    north_east = bounds.get('_northEast') or {}
+    values = [south_west.get('lat'), south_west.get('lng'), north_east.get('lat'), north_east.get('lng')]
+    if any(value is None for value in values) or values[0] >= values[2] or values[1] >= values[3]:
+        return None
+    return tuple(round(float(value), digits) for value in values)
+
+
+_index_cache = ResultCache(max_entries=16)
+
+
+# 카메라 목록(API 응답)으로 색인 생성 (같은 좌표 목록이면 재사용)
+def index_for_cameras(df, lat_column='latitude', lon_column='longitude'):
+    lats = pd.to_numeric(df[lat_column], errors='coerce').to_numpy(dtype=float)
+    lons = pd.to_numeric(df[lon_column], errors='coerce').to_numpy(dtype=float)
+    key = hashlib.sha1(lats.tobytes() + lons.tobytes()).hexdigest()
+    index = _index_cache.get(key)
+    if index is None:
+        index = CameraSpatialIndex(lats, lons)
+        _index_cache.set(key, index)
+    return index
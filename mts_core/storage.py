@@ -0,0 +1,204 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from mts_core.anomaly import refresh_after_insert
+from mts_core.instrument import TimedConnection
+from mts_core.rollup import add_rows_after, ensure_rollup_schema, max_rowid
+
+# 데이터베이스 파일 경로 (환경변수로 변경 가능)
+DB_PATH = os.environ.get('MTS_DB_PATH', 'vehicle_violations.db')
+
+# 업로드 파일 필수 열 (violations 테이블 열 순서와 동일)
+REQUIRED_COLUMNS = [
+    "일련번호", "위반유형", "위반일시", "제한속도", "실제주행속도", "실제초과속도",
+    "고지주행속도", "고지초과속도", "처리상태", "위반차로", "차종", "장소구분",
+    "주민구분", "차명", "위반장소"
+]
+
+# 정수형으로 저장하는 열
+INTEGER_COLUMNS = ["제한속도", "실제주행속도", "실제초과속도", "고지주행속도", "고지초과속도", "위반차로"]
+
+# 한 번의 executemany로 넣을 행 수
+DEFAULT_BATCH_SIZE = 5000
+
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO violations ({columns})
+    VALUES ({placeholders})
+'''.format(columns=', '.join(REQUIRED_COLUMNS), placeholders=', '.join('?' * len(REQUIRED_COLUMNS)))
+
+# 적재 이력(ingest_log)과 연결해 저장할 때 사용
+INSERT_WITH_INGEST_SQL = '''
+    INSERT OR IGNORE INTO violations ({columns}, ingest_id)
+    VALUES ({placeholders}, ?)
+'''.format(columns=', '.join(REQUIRED_COLUMNS), placeholders=', '.join('?' * len(REQUIRED_COLUMNS)))
+
+
+# SQL 문 시간은 성능 측정 중일 때만 기록
+def connect(db_path=None):
+    return sqlite3.connect(db_path or DB_PATH, factory=TimedConnection)
+
+
+# 장비코드는 일련번호 앞 5자리로 DB에서 생성
+EQUIPMENT_CODE_COLUMN_SQL = '장비코드 TEXT GENERATED ALWAYS AS (substr(일련번호, 1, 5)) VIRTUAL'
+
+# 기간/장비/위반유형 조회용 인덱스
+VIOLATION_INDEXES = {
+    'idx_violations_date': '(위반일시)',
+    'idx_violations_equipment_date': '(장비코드, 위반일시)',
+    'idx_violations_type_date': '(위반유형, 위반일시)',
+    'idx_violations_ingest': '(ingest_id)',
+}
+
+
+# violations 테이블 정의 (마이그레이션에서 새 이름으로 다시 만들 때도 사용)
+VIOLATIONS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        일련번호 TEXT PRIMARY KEY,
+        위반유형 TEXT,
+        위반일시 DATETIME,
+        제한속도 INTEGER,
+        실제주행속도 INTEGER,
+        실제초과속도 INTEGER,
+        고지주행속도 INTEGER,
+        고지초과속도 INTEGER,
+        처리상태 TEXT,
+        위반차로 INTEGER,
+        차종 TEXT,
+        장소구분 TEXT,
+        주민구분 TEXT,
+        차명 TEXT,
+        위반장소 TEXT,
+        ingest_id INTEGER,
+        {equipment_code}
+    )
+'''
+
+
+# 데이터베이스 연결 및 테이블 생성 (기존 DB는 스키마 버전에 따라 자동 업그레이드)
+# 버전별 마이그레이션을 먼저 적용 (예전 테이블을 다시 만들기 전에 인덱스/집계를 만들지 않도록)
+def create_database(db_path=None):
+    conn = connect(db_path)
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+    from mts_core.migrations import SCHEMA_VERSION, migrate
+
+    if version < SCHEMA_VERSION:
+        migrate(db_path)
+
+    conn = connect(db_path)
+    try:
+        conn.execute(VIOLATIONS_TABLE_SQL.format(table='violations', equipment_code=EQUIPMENT_CODE_COLUMN_SQL))
+        migrate_database(conn)
+    finally:
+        conn.close()
+
+
+# 기존 violations 테이블에 없는 열과 인덱스를 추가 (여러 번 실행해도 안전)
+def migrate_database(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_xinfo(violations)')]
+    if 'ingest_id' not in columns:
+        conn.execute('ALTER TABLE violations ADD COLUMN ingest_id INTEGER')
+    if '장비코드' not in columns:
+        conn.execute(f'ALTER TABLE violations ADD COLUMN {EQUIPMENT_CODE_COLUMN_SQL}')
+
+    existing_indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing_indexes = [name for name in VIOLATION_INDEXES if name not in existing_indexes]
+    for name in missing_indexes:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON violations {VIOLATION_INDEXES[name]}')
+    if missing_indexes:
+        conn.execute('ANALYZE')
+    ensure_rollup_schema(conn)
+    conn.execute('CREATE TABLE IF NOT EXISTS db_meta (key TEXT PRIMARY KEY, value INTEGER)')
+    conn.commit()
+
+
+# 데이터 변경 시 버전 증가 (조회 결과 캐시 무효화 기준, 변경과 같은 트랜잭션에서 호출)
+def bump_data_version(conn):
+    conn.execute('CREATE TABLE IF NOT EXISTS db_meta (key TEXT PRIMARY KEY, value INTEGER)')
+    conn.execute('''
+        INSERT INTO db_meta (key, value) VALUES ('data_version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1
+    ''')
+
+
+# 현재 데이터 버전 (적재/되돌리기/초기화 때마다 증가)
+def get_data_version(db_path=None):
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM db_meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+# 대량 적재에 맞춘 SQLite 설정
+def apply_bulk_pragmas(conn):
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64MB
+
+
+# 데이터프레임을 열 단위로 변환해 INSERT용 튜플 목록 생성 (iterrows 미사용)
+def dataframe_to_records(df):
+    columns = []
+    for col in REQUIRED_COLUMNS:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+        columns.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+# 데이터프레임을 batch_size 단위의 레코드 묶음으로 분할
+def iter_record_batches(df, batch_size=DEFAULT_BATCH_SIZE):
+    for start in range(0, len(df), batch_size):
+        yield dataframe_to_records(df.iloc[start:start + batch_size])
+
+
+# 레코드 묶음을 열린 트랜잭션 안에서 적재하고 신규/중복 건수 반환 (일자별 집계와 장비별 통계도 함께 갱신)
+def write_batches(conn, batches, ingest_id=None):
+    ensure_rollup_schema(conn)
+    last_rowid = max_rowid(conn)
+    before = conn.total_changes
+    total = 0
+    for batch in batches:
+        if ingest_id is None:
+            conn.executemany(INSERT_SQL, batch)
+        else:
+            conn.executemany(INSERT_WITH_INGEST_SQL, [record + (ingest_id,) for record in batch])
+        total += len(batch)
+    inserted = conn.total_changes - before
+    if inserted:
+        add_rows_after(conn, last_rowid)
+        refresh_after_insert(conn, last_rowid)
+        bump_data_version(conn)
+    return {'total': total, 'inserted': inserted, 'ignored': total - inserted, 'after_rowid': last_rowid}
+
+
+# 레코드 묶음 이터레이터를 하나의 트랜잭션으로 저장 (스트리밍 적재에서 사용)
+def save_batches_to_database(batches, db_path=None):
+    from mts_core.archive import mirror_new_rows
+
+    conn = connect(db_path)
+    try:
+        apply_bulk_pragmas(conn)
+        with conn:  # 전체를 하나의 트랜잭션으로 커밋
+            report = write_batches(conn, batches)
+        if report['inserted']:
+            mirror_new_rows(conn, report['after_rowid'])
+    finally:
+        conn.close()
+    return report
+
+
+# 데이터베이스에 데이터 저장 (일련번호 중복은 INSERT OR IGNORE로 무시)
+def save_to_database(df, batch_size=DEFAULT_BATCH_SIZE, db_path=None):
+    return save_batches_to_database(iter_record_batches(df, batch_size), db_path=db_path)
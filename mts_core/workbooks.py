@@ -0,0 +1,177 @@
+import datetime
+import io
+import os
+
+import pandas as pd
+
+from mts_core.cache import ResultCache
+from mts_core.compare import prepare_tcs, prepare_tems
+from mts_core.instrument import timed
+from mts_core.ledger import file_hash
+from mts_core.storage import connect
+
+# 변환한 TCS/TEMS 엑셀 저장 위치 (파일 내용 해시별 Parquet)
+WORKBOOK_DIR = os.environ.get('MTS_WORKBOOK_DIR', 'workbook_cache')
+
+PREPARERS = {'TCS': prepare_tcs, 'TEMS': prepare_tems}
+
+_frame_cache = ResultCache(max_entries=8)
+_comparison_cache = ResultCache(max_entries=8)
+
+
+def _frame_path(kind, digest, extension, workbook_dir=None):
+    return os.path.join(workbook_dir or WORKBOOK_DIR, f'{kind}-{digest}.{extension}')
+
+
+def _read_stored_frame(kind, digest, workbook_dir=None):
+    path = _frame_path(kind, digest, 'parquet', workbook_dir)
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except ImportError:
+            pass
+    path = _frame_path(kind, digest, 'pkl', workbook_dir)
+    if os.path.exists(path):
+        return pd.read_pickle(path)
+    return None
+
+
+# Parquet으로 저장 (pyarrow가 없거나 한 열에 숫자/문자가 섞여 변환할 수 없으면 pickle)
+def _store_frame(df, kind, digest, workbook_dir=None):
+    os.makedirs(workbook_dir or WORKBOOK_DIR, exist_ok=True)
+    path = _frame_path(kind, digest, 'parquet', workbook_dir)
+    try:
+        import pyarrow as pa
+        try:
+            df.to_parquet(path, index=False)
+            return
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if os.path.exists(path):
+                os.remove(path)
+    except ImportError:
+        pass
+    df.to_pickle(_frame_path(kind, digest, 'pkl', workbook_dir))
+
+
+def ensure_snapshot_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS workbook_snapshots (
+            snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            file_hash TEXT NOT NULL,
+            file_name TEXT,
+            row_count INTEGER,
+            uploaded_at TEXT NOT NULL,
+            UNIQUE (kind, file_hash)
+        )
+    ''')
+    conn.commit()
+
+
+def _record_snapshot(kind, digest, file_name, row_count, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_snapshot_schema(conn)
+        with conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO workbook_snapshots (kind, file_hash, file_name, row_count, uploaded_at) VALUES (?, ?, ?, ?, ?)',
+                (kind, digest, file_name, row_count, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+    finally:
+        conn.close()
+
+
+# 엑셀 내용 -> 열 이름/날짜 형식을 통일한 데이터프레임 (같은 내용이면 엑셀을 다시 읽지 않음)
+@timed('TCS/TEMS 엑셀 변환')
+def load_workbook(data, kind, file_name=None, digest=None, db_path=None, workbook_dir=None):
+    digest = digest or file_hash(data)
+    key = (kind, digest, workbook_dir)
+    df = _frame_cache.get(key)
+    if df is None:
+        df = _read_stored_frame(kind, digest, workbook_dir)
+        if df is None:
+            df = PREPARERS[kind](pd.read_excel(io.BytesIO(data)))
+            _store_frame(df, kind, digest, workbook_dir)
+        _record_snapshot(kind, digest, file_name, len(df), db_path)
+        _frame_cache.set(key, df)
+    return digest, df.copy()
+
+
+# 같은 두 파일/설정의 비교 결과 재사용 (비교 항목만 바꿀 때 다시 계산하지 않음)
+def cached_comparison(key, compare):
+    result = _comparison_cache.get(key)
+    if result is None:
+        result = compare()
+        _comparison_cache.set(key, result)
+    return result
+
+
+# 업로드 이력
+def list_snapshots(kind, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_snapshot_schema(conn)
+        return pd.read_sql_query(
+            'SELECT snapshot_id AS 번호, file_name AS 파일명, row_count AS 장비수, uploaded_at AS 업로드일시, file_hash '
+            'FROM workbook_snapshots WHERE kind = ? ORDER BY snapshot_id DESC',
+            conn, params=(kind,)
+        )
+    finally:
+        conn.close()
+
+
+# 지정한 파일보다 먼저 올린 같은 종류의 직전 파일 (해시, 파일명) 또는 None
+def previous_snapshot(kind, digest, db_path=None):
+    conn = connect(db_path)
+    try:
+        ensure_snapshot_schema(conn)
+        row = conn.execute('''
+            SELECT file_hash, file_name FROM workbook_snapshots
+            WHERE kind = ? AND file_hash != ?
+              AND snapshot_id < coalesce((SELECT snapshot_id FROM workbook_snapshots WHERE kind = ? AND file_hash = ?), -1)
+            ORDER BY snapshot_id DESC LIMIT 1
+        ''', (kind, digest, kind, digest)).fetchone()
+    finally:
+        conn.close()
+    return row
+
+
+# 직전 파일 대비 바뀐 장비만 (추가/삭제/변경, 변경된 값은 '이전 → 현재')
+def diff_snapshots(previous, current, key='장비코드'):
+    previous = previous.drop_duplicates(key, keep='last').set_index(key)
+    current = current.drop_duplicates(key, keep='last').set_index(key)
+    columns = [col for col in current.columns if col in previous.columns]
+    added = current.index.difference(previous.index)
+    removed = previous.index.difference(current.index)
+    common = current.index.intersection(previous.index)
+
+    before = previous.loc[common, columns]
+    after = current.loc[common, columns]
+    changed = before.ne(after) & ~(before.isna() & after.isna())
+    rows = changed.any(axis=1)
+    labels = before[rows].astype(str) + ' → ' + after[rows].astype(str)
+    changes = labels.where(changed[rows], '')
+    changes.insert(0, '변경항목', [', '.join(col for col, flag in zip(columns, flags) if flag) for flags in changed[rows].to_numpy()])
+    changes.insert(0, '변경구분', '변경')
+
+    parts = [
+        pd.DataFrame({'변경구분': '추가'}, index=added).join(current.loc[added, columns]),
+        pd.DataFrame({'변경구분': '삭제'}, index=removed).join(previous.loc[removed, columns]),
+        changes,
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=[key, '변경구분', '변경항목'] + columns)
+    result = pd.concat(parts)
+    return result.rename_axis(key).reset_index()[[key, '변경구분', '변경항목'] + columns]
+
+
+# 직전 업로드 파일과 비교 (직전 파일이 없거나 변환본이 지워졌으면 None)
+def diff_with_previous(kind, digest, current, db_path=None, workbook_dir=None):
+    previous = previous_snapshot(kind, digest, db_path)
+    if previous is None:
+        return None
+    previous_df = _read_stored_frame(kind, previous[0], workbook_dir)
+    if previous_df is None:
+        return None
+    return previous[1], diff_snapshots(previous_df, current)
@@ -0,0 +1,59 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from mts_core.camera_api import CameraApiClient
+
+CAMERAS = [{'mnlssRegltCameraManageNo': f'F{index:04d}', 'ctprvnNm': '경남'} for index in range(25)]
+
+
+# 모드별 응답 (정상 페이지, HTTP 200 XML 오류, resultCode 오류, 형식이 다른 JSON)
+class StubHandler(BaseHTTPRequestHandler):
+    mode = 'ok'
+    requested_pages = []
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        page_no, page_size = int(params['pageNo'][0]), int(params['numOfRows'][0])
+        self.requested_pages.append(page_no)
+        if self.mode == 'xml':
+            self._send('<OpenAPI_ServiceResponse><cmmMsgHeader><returnReasonCode>30</returnReasonCode>'
+                       '</cmmMsgHeader></OpenAPI_ServiceResponse>', 'application/xml')
+        elif self.mode == 'result_code':
+            self._send(json.dumps({'response': {'header': {'resultCode': '03', 'resultMsg': 'NO_DATA'}}}))
+        elif self.mode == 'malformed':
+            self._send(json.dumps({'response': {'header': {'resultCode': '00'}, 'body': {'items': 'oops'}}}))
+        else:
+            items = CAMERAS[(page_no - 1) * page_size:page_no * page_size]
+            self._send(json.dumps({'response': {
+                'header': {'resultCode': '00', 'resultMsg': 'NORMAL_SERVICE'},
+                'body': {'items': items, 'totalCount': len(CAMERAS), 'pageNo': page_no},
+            }}))
+
+    def _send(self, text, content_type='application/json'):
+        data = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_client():
+    StubHandler.mode = 'ok'
+    StubHandler.requested_pages = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = CameraApiClient(base_url=f'http://127.0.0.1:{server.server_address[1]}/', page_size=10, retries=0)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1 @@
+from tests.camera_stub import stub_client  # noqa: F401
@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from benchmarks.generate import generate_violations
+from mts_core import archive
+from mts_core.cache import result_cache
+from mts_core.ledger import ingest_batches, rollback_ingest
+from mts_core.queries import load_violations
+from mts_core.storage import create_database, iter_record_batches
+
+
+@pytest.fixture
+def archived_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, 'ARCHIVE_ENABLED', True)
+    monkeypatch.setattr(archive, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+    result_cache.clear()
+    yield db_path
+    result_cache.clear()
+
+
+def _ingest(db_path, df, name):
+    return ingest_batches(name * 8, f'{name}.xlsx', iter_record_batches(df), db_path=db_path)['ingest_id']
+
+
+def test_rollback_after_rebuild_removes_rows_from_archive(archived_db):
+    df = generate_violations(1000, seed=2)
+    _ingest(archived_db, df.iloc[:500], 'first')
+    second = _ingest(archived_db, df.iloc[500:], 'second')
+    archive.rebuild_archive(archived_db)
+    assert archive.archive_is_current(archived_db)
+
+    rollback_ingest(second, db_path=archived_db)
+
+    assert archive.archive_is_current(archived_db)
+    loaded = load_violations(datetime.date(2000, 1, 1), datetime.date(2100, 1, 1), db_path=archived_db)
+    assert len(loaded) == 500
+    assert set(loaded['일련번호']) == set(df['일련번호'].iloc[:500])
+
+
+def test_rollback_of_mirrored_ingest_removes_its_files(archived_db):
+    df = generate_violations(400, seed=3)
+    _ingest(archived_db, df.iloc[:200], 'first')
+    second = _ingest(archived_db, df.iloc[200:], 'second')
+
+    rollback_ingest(second, db_path=archived_db)
+
+    assert archive.archive_is_current(archived_db)
+    assert len(archive.load_archive()) == 200
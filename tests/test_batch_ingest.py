@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.generate import generate_violations
+from mts_core import batch_ingest
+from mts_core.storage import create_database
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    df = generate_violations(300, seed=1)
+    first, second = tmp_path / 'first.xlsx', tmp_path / 'second.xlsx'
+    df.iloc[:200].to_excel(first, index=False)
+    df.iloc[100:].to_excel(second, index=False)
+    return [str(first), str(second)], df
+
+
+def test_shared_rows_are_dropped_from_later_file(tmp_path, workbooks):
+    paths, df = workbooks
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+
+    reports = batch_ingest.ingest_workbooks(paths, db_path=db_path, workers=1)
+
+    assert [report['inserted'] for report in reports] == [200, 100]
+    assert reports[1]['batch_duplicates'] == 100
+
+
+def test_failed_file_does_not_drop_rows_from_later_file(tmp_path, workbooks, monkeypatch):
+    paths, df = workbooks
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+
+    ingest_batches = batch_ingest.ingest_batches
+    calls = []
+
+    def failing_first(digest, file_name, batches, db_path=None):
+        calls.append(file_name)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return ingest_batches(digest, file_name, batches, db_path=db_path)
+
+    monkeypatch.setattr(batch_ingest, 'ingest_batches', failing_first)
+    reports = batch_ingest.ingest_workbooks(paths, db_path=db_path, workers=1)
+
+    assert reports[0]['error'] is not None
+    assert reports[1]['error'] is None
+    assert reports[1]['batch_duplicates'] == 0
+    assert reports[1]['inserted'] == 200
+
+    conn = sqlite3.connect(db_path)
+    try:
+        stored = {row[0] for row in conn.execute('SELECT 일련번호 FROM violations')}
+    finally:
+        conn.close()
+    assert stored == set(df['일련번호'].iloc[100:])
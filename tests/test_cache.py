@@ -0,0 +1,86 @@
+import sqlite3
+
+import pandas as pd
+
+from mts_core.cache import ResultCache, cached_query, result_bytes, result_cache
+from mts_core.storage import bump_data_version, create_database
+
+
+@cached_query
+def _count(table, db_path=None):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _insert_row(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO violations (일련번호) VALUES ('F0001A')")
+            bump_data_version(conn)
+    finally:
+        conn.close()
+
+
+def test_positional_db_path_is_invalidated_on_change(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+    result_cache.clear()
+
+    assert _count('violations', db_path) == 0
+    _insert_row(db_path)
+    assert _count('violations', db_path) == 1
+
+
+def test_positional_and_keyword_calls_share_an_entry(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+    result_cache.clear()
+
+    _count('violations', db_path)
+    misses = result_cache.stats()['misses']
+    _count('violations', db_path=db_path)
+    assert result_cache.stats()['misses'] == misses
+
+
+def test_cache_is_bounded_by_bytes():
+    frame = pd.DataFrame({'값': ['가나다라마바사'] * 1000})
+    size = result_bytes(frame)
+    cache = ResultCache(max_entries=100, max_bytes=size * 2)
+
+    for key in range(3):
+        cache.set(key, frame.copy())
+
+    assert 0 not in cache
+    assert 1 in cache and 2 in cache
+    assert cache.stats()['bytes'] == size * 2
+
+
+def test_result_larger_than_limit_is_not_cached():
+    frame = pd.DataFrame({'값': range(1000)})
+    cache = ResultCache(max_bytes=result_bytes(frame) - 1)
+
+    cache.set('big', frame)
+
+    assert 'big' not in cache
+    assert cache.stats()['bytes'] == 0
+
+
+def test_hit_returns_shallow_copy_that_keeps_cache_intact(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    create_database(db_path)
+    result_cache.clear()
+
+    @cached_query
+    def frame(db_path=None):
+        return pd.DataFrame({'값': [1, 2, 3]})
+
+    first = frame(db_path)
+    first['추가'] = 0
+    first['값'] = first['값'] * 10
+
+    assert list(frame(db_path).columns) == ['값']
+    assert list(frame(db_path)['값']) == [1, 2, 3]
@@ -0,0 +1,19 @@
+import pytest
+
+from mts_core.camera_api import CameraApiError
+from tests.camera_stub import CAMERAS, StubHandler
+
+
+def test_all_pages_are_fetched(stub_client):
+    items = stub_client.get_camera_data(city='경남')
+
+    assert [item['mnlssRegltCameraManageNo'] for item in items] == [camera['mnlssRegltCameraManageNo'] for camera in CAMERAS]
+    assert sorted(StubHandler.requested_pages) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('mode', ['xml', 'result_code', 'malformed'])
+def test_error_bodies_raise_camera_api_error(stub_client, mode):
+    StubHandler.mode = mode
+
+    with pytest.raises(CameraApiError):
+        stub_client.get_camera_data(city='경남')
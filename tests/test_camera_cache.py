@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from mts_core.camera_api import CameraApiError
+from mts_core.camera_cache import CachedCameraClient
+from tests.camera_stub import StubHandler
+
+
+@pytest.mark.parametrize('mode', ['xml', 'result_code', 'malformed'])
+def test_expired_data_is_served_when_api_returns_error_body(tmp_path, stub_client, mode):
+    cached = CachedCameraClient(client=stub_client, db_path=str(tmp_path / 'test.db'), ttl=0, stale_while_revalidate=False)
+    items, info = cached.get_with_info(city='경남')
+    assert info['source'] == 'api'
+
+    StubHandler.mode = mode
+    stale_items, info = cached.get_with_info(city='경남')
+
+    assert info['source'] == 'stale'
+    assert stale_items == items
+
+
+def test_background_refresh_failure_keeps_cached_data(tmp_path, stub_client):
+    cached = CachedCameraClient(client=stub_client, db_path=str(tmp_path / 'test.db'), ttl=0)
+    items, _ = cached.get_with_info(city='경남')
+
+    StubHandler.mode = 'xml'
+    stale_items, info = cached.get_with_info(city='경남')
+    deadline = time.time() + 5
+    while cached._refreshing and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert info['source'] == 'stale'
+    assert stale_items == items
+    assert not cached._refreshing
+    assert cached.get_with_info(city='경남')[0] == items
+
+
+def test_error_without_cached_data_is_raised(tmp_path, stub_client):
+    cached = CachedCameraClient(client=stub_client, db_path=str(tmp_path / 'test.db'))
+    StubHandler.mode = 'xml'
+
+    with pytest.raises(CameraApiError):
+        cached.get_with_info(city='경남')
@@ -0,0 +1,29 @@
+import sqlite3
+
+from mts_core.instrument import TimedConnection, finish_run, start_run
+
+
+def test_connection_execute_is_recorded():
+    conn = sqlite3.connect(':memory:', factory=TimedConnection)
+    run = start_run('test')
+    try:
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.executemany('INSERT INTO t VALUES (?)', [(1,), (2,), (3,)])
+        rows = conn.execute('SELECT x FROM t').fetchall()
+    finally:
+        finish_run(run)
+        conn.close()
+
+    assert rows == [(1,), (2,), (3,)]
+    sqls = [record['sql'] for record in run.statements]
+    assert sqls == ['CREATE TABLE t (x INTEGER)', 'INSERT INTO t VALUES (?)', 'SELECT x FROM t']
+    assert run.statements[1]['rows'] == 3
+    assert run.statements[2]['rows'] == 3
+
+
+def test_connection_execute_without_run_is_not_recorded():
+    conn = sqlite3.connect(':memory:', factory=TimedConnection)
+    try:
+        assert conn.execute('SELECT 1').fetchone() == (1,)
+    finally:
+        conn.close()
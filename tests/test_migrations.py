@@ -0,0 +1,50 @@
+import sqlite3
+
+from mts_core.instrument import finish_run, start_run
+from mts_core.migrations import SCHEMA_VERSION
+from mts_core.storage import REQUIRED_COLUMNS, create_database
+
+LEGACY_TABLE_SQL = 'CREATE TABLE violations ({})'.format(', '.join(f'{col} TEXT' for col in REQUIRED_COLUMNS))
+
+
+def _legacy_database(path, keys):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(LEGACY_TABLE_SQL)
+        conn.executemany('INSERT INTO violations (일련번호, 위반유형, 위반일시) VALUES (?, ?, ?)',
+                         [(key, '신호위반', '2024-10-01 10:00:00') for key in keys])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_legacy_database_is_rebuilt_with_key(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    _legacy_database(path, ['F0001A', 'F0001B', 'F0001A', 'F0002A', 'F0001A'])
+
+    create_database(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert sorted(row[0] for row in conn.execute('SELECT 일련번호 FROM violations')) == ['F0001A', 'F0001B', 'F0002A']
+        assert conn.execute('SELECT SUM(건수) FROM daily_rollup').fetchone()[0] == 3
+        conn.execute("INSERT OR IGNORE INTO violations (일련번호) VALUES ('F0001A')")
+        assert conn.execute('SELECT COUNT(*) FROM violations').fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_indexes_are_not_built_on_the_legacy_table(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    _legacy_database(path, ['F0001A', 'F0001A'])
+
+    run = start_run('test')
+    try:
+        create_database(path)
+    finally:
+        finish_run(run)
+
+    sqls = [record['sql'] for record in run.statements]
+    rebuilt = next(index for index, sql in enumerate(sqls) if sql.startswith('DROP TABLE violations'))
+    assert not any(sql.startswith('CREATE INDEX') for sql in sqls[:rebuilt])
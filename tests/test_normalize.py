@@ -0,0 +1,37 @@
+import pandas as pd
+
+from mts_core.normalize import ValueNormalizer
+
+
+def _frames(tcs_values, tems_values):
+    return pd.DataFrame(tcs_values), pd.DataFrame(tems_values)
+
+
+def test_distinct_police_stations_are_not_merged(tmp_path):
+    normalizer = ValueNormalizer(str(tmp_path / 'test.db'))
+    df_tcs, df_tems = _frames({'관할경찰서': ['창원중부경찰서', '마산동부경찰서']},
+                              {'관할경찰서': ['창원서부경찰서', '마산중부경찰서']})
+
+    _, aligned_tems = normalizer.align(df_tcs, df_tems)
+
+    assert list(aligned_tems['관할경찰서']) == ['창원서부경찰서', '마산중부경찰서']
+    assert normalizer.learned_mappings().empty
+
+
+def test_police_station_notation_is_canonicalized(tmp_path):
+    normalizer = ValueNormalizer(str(tmp_path / 'test.db'))
+    df_tcs, df_tems = _frames({'관할경찰서': ['창원중부경찰서']}, {'관할경찰서': ['창원중부경찰서 ']})
+
+    aligned_tcs, aligned_tems = normalizer.align(df_tcs, df_tems)
+
+    assert list(aligned_tcs['관할경찰서']) == list(aligned_tems['관할경찰서'])
+
+
+def test_installer_variants_are_merged(tmp_path):
+    normalizer = ValueNormalizer(str(tmp_path / 'test.db'))
+    df_tcs, df_tems = _frames({'설치업체': ['한국교통시스템']}, {'설치업체': ['(주)한국교통시스템즈']})
+
+    aligned_tcs, aligned_tems = normalizer.align(df_tcs, df_tems)
+
+    assert list(aligned_tems['설치업체']) == list(aligned_tcs['설치업체'])
+    assert list(normalizer.learned_mappings()['열']) == ['설치업체']
@@ -0,0 +1,19 @@
+from benchmarks.generate import generate_inventory_pair
+from mts_core.reconcile import find_pairs, reconcile_all
+
+
+def test_failed_region_keeps_integer_counts(tmp_path):
+    source = tmp_path / 'in'
+    source.mkdir()
+    tcs, tems = generate_inventory_pair(100, seed=1)
+    tcs.to_excel(source / '경남_TCS.xlsx', index=False)
+    tems.to_excel(source / '경남_TEMS.xlsx', index=False)
+    (source / '부산_TCS.xlsx').write_bytes(b'not a workbook')
+    tems.to_excel(source / '부산_TEMS.xlsx', index=False)
+
+    summary = reconcile_all(find_pairs(str(source)), str(tmp_path / 'out'), report_format='csv', workers=1)
+
+    assert list(summary['지역']) == ['경남', '부산']
+    assert summary['TCS 장비수'].dtype == 'Int64'
+    assert summary['오류'].isna().tolist() == [True, False]
+    assert '.0,' not in (tmp_path / 'out' / '종합요약.csv').read_text(encoding='utf-8-sig')